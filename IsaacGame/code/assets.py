@@ -0,0 +1,59 @@
+# assets.py
+import pygame_env
+import pygame
+from collections import OrderedDict
+from os.path import join, dirname, abspath
+
+IMAGES_FOLDER = join(dirname(dirname(abspath(__file__))), 'images')
+MAX_CACHED_VARIANTS = 256
+
+
+class AssetCache:
+    # Process-wide image cache. Every file is decoded once; scaled/rotated/flipped variants are
+    # memoized in a bounded LRU. Returned surfaces are shared, callers must copy before drawing on them.
+    def __init__(self, max_variants=MAX_CACHED_VARIANTS):
+        self.max_variants = max_variants
+        self.images = {}
+        self.variants = OrderedDict()
+
+    def load(self, name, folder='assets', alpha=True):
+        key = (folder, name, alpha)
+        image = self.images.get(key)
+        if image is None:
+            image = pygame.image.load(join(IMAGES_FOLDER, folder, name))
+            image = image.convert_alpha() if alpha else image.convert()
+            self.images[key] = image
+        return image
+
+    def get(self, name, size=None, scale=None, angle=0, flip_x=False, flip_y=False, folder='assets', alpha=True, colorkey=None):
+        # Transforms are applied in the order: resize (size or scale factor), rotate, flip, then the colorkey is set
+        key = (folder, name, alpha, size, scale, angle, flip_x, flip_y, colorkey)
+        image = self.variants.get(key)
+        if image is not None:
+            self.variants.move_to_end(key)
+            return image
+
+        image = self.load(name, folder, alpha)
+        if scale is not None:
+            size = (int(image.get_width() * scale), int(image.get_height() * scale))
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        if angle:
+            image = pygame.transform.rotate(image, angle)
+        if flip_x or flip_y:
+            image = pygame.transform.flip(image, flip_x, flip_y)
+        if colorkey is not None:
+            if image is self.images[(folder, name, alpha)]: image = image.copy()  # never key the shared original
+            image.set_colorkey(colorkey)
+
+        self.variants[key] = image
+        if len(self.variants) > self.max_variants:
+            self.variants.popitem(last=False)
+        return image
+
+    def clear(self):
+        self.images.clear()
+        self.variants.clear()
+
+
+assets = AssetCache()
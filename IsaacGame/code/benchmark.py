@@ -0,0 +1,191 @@
+# benchmark.py
+# Reproducible headless scenarios against the real game code. Each scenario runs in a fresh interpreter
+# and reports ticks per second, p99 tick time and peak memory; results can be stored as a baseline
+# and later runs fail when they regress past a threshold.
+#   python benchmark.py [--scenario enemies_200 ...] [--save-baseline base.json]
+#   python benchmark.py --baseline base.json [--threshold 0.15]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+SEED = 1234
+
+
+def spawn_enemies(game, count):
+    from sprites import Enemy_Greed, Spider
+    rng = np.random.default_rng(SEED)
+    room = game.current_room.rect.inflate(-200, -200)
+    for i in range(count):
+        pos = (int(rng.integers(room.left, room.right)), int(rng.integers(room.top, room.bottom)))
+        enemy_class = Enemy_Greed if i % 2 == 0 else Spider
+        enemy_class(pos, (game.all_sprites, game.enemy_sprites), game.collision_sprites, game.player, game.enemy_sprites)
+
+
+def new_game():
+    from main import Game
+    from settings import WIDTH, HEIGHT
+    return Game(WIDTH, HEIGHT, headless=True, seed=SEED)
+
+
+def timed_ticks(game, ticks, action_for):
+    times = np.empty(ticks)
+    for tick in range(ticks):
+        start = time.perf_counter()
+        game.step(action_for(tick))
+        times[tick] = time.perf_counter() - start
+    return times
+
+
+def scenario_enemies_200(ticks):
+    # 200 enemies (half Enemy_Greed, half Spider) chasing a player standing still
+    from simulation import NO_ACTION
+    game = new_game()
+    spawn_enemies(game, 200)
+    return timed_ticks(game, ticks, lambda tick: NO_ACTION)
+
+
+def scenario_tear_fire(ticks):
+    # No cooldown, a tear every tick in rotating directions, 20 enemies to hit
+    from simulation import Action
+    game = new_game()
+    game.tear_cooldown = 0
+    spawn_enemies(game, 20)
+    directions = ((1, 0), (0, 1), (-1, 0), (0, -1))
+    return timed_ticks(game, ticks, lambda tick: Action((0, 0), directions[tick % 4]))
+
+
+def scenario_room_transitions(ticks):
+    # Walk through the same door back and forth: every finished transition starts the next room change
+    from simulation import NO_ACTION
+    game = new_game()
+    (dx, dy), _ = next(iter(game.current_room.neighbors.items()))
+    times = np.empty(ticks)
+    for tick in range(ticks):
+        start = time.perf_counter()
+        if not game.transitioning:
+            game.change_room(dx, dy)
+            dx, dy = -dx, -dy
+        game.step(NO_ACTION)
+        times[tick] = time.perf_counter() - start
+    return times
+
+
+def scenario_dungeons_10k(ticks):
+    # One "tick" is one full floor: generate_grid + special room placement, for 10k seeds
+    from proceduralboxestest import generate_grid, place_special_rooms
+    times = np.empty(10000)
+    for seed in range(10000):
+        start = time.perf_counter()
+        place_special_rooms(generate_grid(seed=seed))
+        times[seed] = time.perf_counter() - start
+    return times
+
+
+def scenario_dungeon_batch_10k(ticks):
+    # Vectorized generation of the same 10k floors; one sample per 1000-seed batch, tps counts floors
+    from proceduralboxestest import generate_grid_batch
+    batches = np.empty(10)
+    for i in range(10):
+        start = time.perf_counter()
+        generate_grid_batch(range(i * 1000, (i + 1) * 1000))
+        batches[i] = time.perf_counter() - start
+    return np.repeat(batches / 1000, 1000)
+
+
+SCENARIOS = {
+    'enemies_200': scenario_enemies_200,
+    'tear_fire': scenario_tear_fire,
+    'room_transitions': scenario_room_transitions,
+    'dungeons_10k': scenario_dungeons_10k,
+    'dungeon_batch_10k': scenario_dungeon_batch_10k,
+}
+
+
+def peak_memory_mb():
+    # Peak resident set size of this process, None where it cannot be read (no resource module on Windows).
+    # Resident size rather than tracemalloc: surfaces live in SDL's own allocations, which tracemalloc misses.
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def run_scenario(name, ticks):
+    # Inside the child interpreter: run, then report as one JSON line
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    times = SCENARIOS[name](ticks)
+    print(json.dumps({
+        'ticks_per_second': len(times) / times.sum(),
+        'p99_ms': float(np.percentile(times, 99) * 1000),
+        'peak_memory_mb': peak_memory_mb(),
+    }))
+
+
+def measure(name, ticks):
+    code_folder = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-scenario', name, '--ticks', str(ticks)],
+                            cwd=code_folder, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def regressions(name, result, baseline, threshold):
+    # Slower, spikier or bigger than the baseline by more than threshold (a fraction)
+    problems = []
+    if result['ticks_per_second'] < baseline['ticks_per_second'] * (1 - threshold):
+        problems.append(f"{name}: {result['ticks_per_second']:.0f} ticks/s < baseline {baseline['ticks_per_second']:.0f}")
+    if result['p99_ms'] > baseline['p99_ms'] * (1 + threshold):
+        problems.append(f"{name}: p99 {result['p99_ms']:.3f} ms > baseline {baseline['p99_ms']:.3f} ms")
+    if result['peak_memory_mb'] is None or baseline.get('peak_memory_mb') is None:
+        return problems  # memory not measured on one side
+    if result['peak_memory_mb'] > baseline['peak_memory_mb'] * (1 + threshold):
+        problems.append(f"{name}: peak {result['peak_memory_mb']:.1f} MB > baseline {baseline['peak_memory_mb']:.1f} MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless performance scenarios with baseline comparison")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="default: all")
+    parser.add_argument('--ticks', type=int, default=1000, help="ticks per game scenario")
+    parser.add_argument('--baseline', default=None, help="JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.15, help="allowed regression as a fraction")
+    parser.add_argument('--save-baseline', default=None, help="write this run's results as a baseline JSON")
+    parser.add_argument('--run-scenario', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        run_scenario(args.run_scenario, args.ticks)
+        return 0
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        results[name] = result = measure(name, args.ticks)
+        peak = result['peak_memory_mb']
+        print(f"{name:>18}: {result['ticks_per_second']:10.0f} ticks/s  p99 {result['p99_ms']:8.3f} ms  "
+              f"peak {'n/a' if peak is None else f'{peak:.1f} MB':>10}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        problems = []
+        for name, result in results.items():
+            if name in baseline:
+                problems += regressions(name, result, baseline[name], args.threshold)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# benchmark_startup.py
+# Measures what a fresh worker pays before its first useful step: importing main, building a headless
+# Game and producing the first frame. Every sample runs in a new interpreter so nothing is warm.
+#   python benchmark_startup.py [--runs 5] [--budget-ms 1500]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r'''
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+game = main.Game(main.WIDTH, main.HEIGHT, headless=True)
+constructed = time.perf_counter()
+game.step()
+game.draw_frame()
+first_frame = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'game_init_ms': (constructed - imported) * 1000,
+    'first_frame_ms': (first_frame - constructed) * 1000,
+    'total_ms': (first_frame - start) * 1000,
+}))
+'''
+
+
+def measure_once():
+    code_folder = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=code_folder, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(runs):
+    samples = [measure_once() for _ in range(runs)]
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of a headless Game (median over fresh interpreters)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=None, help="fail if total startup exceeds this")
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    for key, value in report.items():
+        print(f"{key:>15}: {value:8.1f} ms")
+
+    if args.budget_ms is not None and report['total_ms'] > args.budget_ms:
+        print(f"Startup budget exceeded: {report['total_ms']:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# dungeon_analysis.py
+import numpy as np
+from collections import deque
+
+
+class DungeonAnalysis:
+    # Graph facts about one Dungeon, computed once in linear time and shared by every placement rule:
+    # BFS distance from the start room, dead ends, articulation points and the farthest room.
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.distances = distance_field(dungeon.start_room)
+        self.distance_grid = np.full(dungeon.grid.shape, -1, dtype=np.int32)
+        for room, distance in self.distances.items():
+            self.distance_grid[room.grid_y, room.grid_x] = distance
+        self.max_distance = max(self.distances.values())
+        # Ties go to the earliest placed room (generate_grid_batch relies on the same rule)
+        self.farthest_room = max(dungeon.rooms, key=lambda room: self.distances.get(room, -1))
+        self.dead_ends = [room for room in dungeon.rooms if len(room.neighbors) == 1]
+        self.articulation_points = find_articulation_points(dungeon.rooms, dungeon.start_room)
+
+    def distance(self, room):
+        return self.distances.get(room, -1)
+
+    def dead_ends_by_distance(self, exclude=()):
+        # Farthest first, placement order on ties
+        candidates = [room for room in self.dead_ends if room not in exclude]
+        return sorted(candidates, key=lambda room: -self.distance(room))
+
+
+def distance_field(start_room):
+    distances = {start_room: 0}
+    queue = deque([start_room])
+    while queue:
+        room = queue.popleft()
+        for neighbor in room.neighbors.values():
+            if neighbor not in distances:
+                distances[neighbor] = distances[room] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def find_articulation_points(rooms, root):
+    # Rooms whose removal disconnects the floor (iterative Tarjan, no recursion limit on big floors)
+    index = {root: 0}
+    low = {root: 0}
+    points = set()
+    root_children = 0
+    stack = [(root, None, iter(root.neighbors.values()))]
+    while stack:
+        room, parent, neighbors = stack[-1]
+        descended = False
+        for neighbor in neighbors:
+            if neighbor not in index:
+                index[neighbor] = low[neighbor] = len(index)
+                if room is root:
+                    root_children += 1
+                stack.append((neighbor, room, iter(neighbor.neighbors.values())))
+                descended = True
+                break
+            elif neighbor is not parent:
+                low[room] = min(low[room], index[neighbor])
+        if descended:
+            continue
+        stack.pop()
+        if parent is not None:
+            low[parent] = min(low[parent], low[room])
+            if parent is not root and low[room] >= index[parent]:
+                points.add(parent)
+    if root_children > 1:
+        points.add(root)
+    return [room for room in rooms if room in points]
@@ -0,0 +1,190 @@
+# entities.py
+import numpy as np
+from simulation import get_ticks
+
+KIND_GREED = 0
+KIND_SPIDER = 1
+
+STATE_CHASE = 0     # Enemy_Greed: always walks at the player
+STATE_IDLE = 1      # Spider: picks a new direction this tick
+STATE_MOVING = 2
+STATE_STOPPING = 3
+
+# Per-enemy arrays of the store, in a fixed order (swap-remove and snapshots walk this list)
+ENEMY_FIELDS = ('pos', 'direction', 'hit_points', 'max_hit_points', 'speed', 'chase_speed', 'kind', 'state',
+                'state_time', 'chasing', 'move_duration', 'stop_duration', 'stop_on_hit')
+
+
+class EnemyStore:
+    # Struct-of-arrays state for every enemy in the room. Sprites are thin views (image, rect, index);
+    # AI, timers and movement for all enemies are computed in one batched step per tick.
+    # Arrays stay dense: removing an enemy moves the last one into its slot.
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.sprites = []
+        self.player = None
+        self.rng = np.random.default_rng()
+        self.verbose = True  # enemies print hits and deaths; Game turns it off when headless
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        old = getattr(self, 'pos', None)
+        fields = {
+            'pos': ((capacity, 2), np.float64),        # hitbox center
+            'direction': ((capacity, 2), np.float64),
+            'hit_points': ((capacity,), np.int32),
+            'max_hit_points': ((capacity,), np.int32),
+            'speed': ((capacity,), np.float64),
+            'chase_speed': ((capacity,), np.float64),
+            'kind': ((capacity,), np.int8),
+            'state': ((capacity,), np.int8),
+            'state_time': ((capacity,), np.float64),   # sim ticks of the last state change
+            'chasing': ((capacity,), np.bool_),
+            'move_duration': ((capacity,), np.float64),
+            'stop_duration': ((capacity,), np.float64),
+            'stop_on_hit': ((capacity,), np.bool_),
+        }
+        for name, (shape, dtype) in fields.items():
+            array = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, sprite):
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        i = self.count
+        self.pos[i] = sprite.hitbox_rect.center
+        self.direction[i] = 0
+        self.hit_points[i] = sprite.MAX_HIT_POINTS
+        self.max_hit_points[i] = sprite.MAX_HIT_POINTS
+        self.speed[i] = sprite.SPEED
+        self.chase_speed[i] = sprite.CHASE_SPEED
+        self.kind[i] = sprite.KIND
+        self.state[i] = STATE_CHASE if sprite.KIND == KIND_GREED else STATE_IDLE
+        self.state_time[i] = get_ticks()
+        self.chasing[i] = sprite.KIND == KIND_GREED
+        self.move_duration[i] = sprite.MOVE_DURATION
+        self.stop_duration[i] = sprite.STOP_DURATION
+        self.stop_on_hit[i] = sprite.STOP_ON_HIT
+        self.sprites.append(sprite)
+        sprite.index = i
+        self.player = sprite.player  # every enemy chases the same player
+        self.count += 1
+
+    def remove(self, sprite):
+        i = sprite.index
+        last = self.count - 1
+        if i != last:
+            for name in ENEMY_FIELDS:
+                array = getattr(self, name)
+                array[i] = array[last]
+            moved = self.sprites[last]
+            self.sprites[i] = moved
+            moved.index = i
+        self.sprites.pop()
+        self.count -= 1
+        sprite.index = None
+
+    def update(self, dt, enemy_group):
+        n = self.count
+        if n == 0: return
+        now = get_ticks()
+        pos = self.pos[:n]
+        direction = self.direction[:n]
+        kind = self.kind[:n]
+        state = self.state[:n]
+        elapsed = now - self.state_time[:n]
+
+        # Unit vector towards the player for everyone (zero when standing on it)
+        to_player = np.asarray(self.player.rect.center, dtype=np.float64) - pos
+        distance = np.hypot(to_player[:, 0], to_player[:, 1])
+        chase = np.divide(to_player, distance[:, None], out=np.zeros_like(to_player), where=distance[:, None] > 0)
+
+        greed = kind == KIND_GREED
+        direction[greed] = chase[greed]
+        moving = greed.copy()
+
+        spider = kind == KIND_SPIDER
+        idle = spider & (state == STATE_IDLE)
+        running = spider & (state == STATE_MOVING)
+        stopping = spider & (state == STATE_STOPPING)
+
+        # Moving spiders whose time is up stop; the rest keep walking
+        stop_now = running & (elapsed >= self.move_duration[:n])
+        direction[stop_now] = 0
+        state[stop_now] = STATE_STOPPING
+        self.state_time[:n][stop_now] = now
+        moving |= running & ~stop_now
+
+        # Stopped spiders whose pause is over become idle (they pick a direction next tick)
+        wake = stopping & (elapsed >= self.stop_duration[:n])
+        state[wake] = STATE_IDLE
+        self.state_time[:n][wake] = now
+
+        # Idle spiders: 2/3 chase the player, 1/3 wander in a random direction, and start moving at once
+        picking = np.flatnonzero(idle)
+        if len(picking):
+            chasing = self.rng.random(len(picking)) < 2 / 3
+            wander = self.rng.uniform(-1, 1, (len(picking), 2))
+            length = np.hypot(wander[:, 0], wander[:, 1])
+            wander = np.divide(wander, length[:, None], out=np.tile([1.0, 0.0], (len(picking), 1)), where=length[:, None] > 0)
+            direction[picking] = np.where(chasing[:, None], chase[picking], wander)
+            self.chasing[picking] = chasing
+            state[picking] = STATE_MOVING
+            self.state_time[picking] = now
+            moving[picking] = True
+
+        speed = np.where(self.chasing[:n] & spider, self.chase_speed[:n], self.speed[:n])
+        moving &= (direction[:, 0] != 0) | (direction[:, 1] != 0) | greed
+        step = direction * (speed * dt)[:, None]
+
+        # Collision has to be resolved in order (each enemy sees the others' new positions),
+        # so only this part runs per enemy: one swept query per group, then x and y are resolved
+        player_hitbox = getattr(self.player, 'hitbox_rect', self.player.rect)
+        movers = np.flatnonzero(moving)
+        targets = pos[movers] + step[movers]
+        pixels = np.rint(targets).astype(np.int64)
+        stop_on_hit = self.stop_on_hit[movers].tolist()
+        static_map = self.sprites[0].collision_sprites.collision_map  # every enemy shares the room's walls
+        rows = zip(movers.tolist(), targets.tolist(), pixels.tolist(), direction[movers].tolist(), stop_on_hit)
+        for i, (target_x, target_y), (pixel_x, pixel_y), (direction_x, direction_y), stops in rows:
+            sprite = self.sprites[i]
+            hitbox = sprite.hitbox_rect
+            sweep = hitbox.union(hitbox.move(pixel_x - hitbox.centerx, pixel_y - hitbox.centery)).inflate(2, 2)
+            others = static_map.query(sweep)  # walls and rocks on the tiles swept
+            others.append(player_hitbox)
+            others += [entity.hitbox_rect for entity in sprite.enemy_sprites.query(sweep) if entity is not sprite]
+
+            hitbox.centerx = pixel_x
+            if resolve_horizontal(hitbox, others, direction_x):
+                target_x = hitbox.centerx
+                if stops: direction[i, 0] = 0
+            hitbox.centery = pixel_y
+            if resolve_vertical(hitbox, others, direction_y):
+                target_y = hitbox.centery
+                if stops: direction[i, 1] = 0
+            pos[i] = (target_x, target_y)
+            sprite.rect.center = hitbox.center
+            enemy_group.relocate(sprite)
+
+
+def resolve_horizontal(hitbox, others, direction_x):
+    hit = False
+    for other in others:
+        if other.colliderect(hitbox):
+            hit = True
+            if direction_x > 0: hitbox.right = other.left
+            if direction_x < 0: hitbox.left = other.right
+    return hit
+
+
+def resolve_vertical(hitbox, others, direction_y):
+    hit = False
+    for other in others:
+        if other.colliderect(hitbox):
+            hit = True
+            if direction_y > 0: hitbox.bottom = other.top
+            if direction_y < 0: hitbox.top = other.bottom
+    return hit
@@ -1,17 +1,133 @@
+import pygame_env
 import pygame.sprite
 from settings import *
+from spatial_hash import SpatialHash
+from entities import EnemyStore
+from tilemap import StaticCollisionMap
+from sprites import (HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT, HEALTH_BAR_OFFSET_Y, HEALTH_COLOR, HEALTH_BG_COLOR,
+                     HEALTH_BORDER_COLOR)
 
 class AllSprites(pygame.sprite.Group):
-    def __init__(self):
-        super().__init__()
-        self.display_surface = pygame.display.get_surface()
-        self.offset = pygame.Vector2()
-
-    def draw(self, surface, target_position):
-        self.offset.x = -(target_position[0] - WIDTH / 2)
-        self.offset.y = -(target_position[1] - HEIGHT / 2)
-
-        for sprite in self:
-            draw_pos = sprite.rect.center + self.offset  # Calculate draw position relative to the camera
-            draw_rect = sprite.image.get_rect(center=draw_pos)
-            surface.blit(sprite.image, draw_rect.topleft)
\ No newline at end of file
+    # Render queue for everything drawn in the world. Members are kept per layer (their class's RENDER_LAYER,
+    # drawn bottom to top); draw() culls whatever is outside the camera view and submits each layer with
+    # one Surface.blits call. Health bars are cut from a pre-drawn sheet instead of drawn rect by rect.
+    def __init__(self, *sprites):
+        self.layers = {}        # layer -> {sprite: None}, insertion ordered
+        self.layer_order = []
+        self.health_bar_sheet = None
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        layer = getattr(sprite, 'RENDER_LAYER', LAYER_ENEMIES)
+        if layer not in self.layers:
+            self.layers[layer] = {}
+            self.layer_order = sorted(self.layers)
+        self.layers[layer][sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.layers[getattr(sprite, 'RENDER_LAYER', LAYER_ENEMIES)].pop(sprite, None)
+
+    def in_draw_order(self):
+        for layer in self.layer_order:
+            yield from self.layers[layer]
+
+    def draw(self, surface, offset):
+        # offset: camera offset (world position of the screen's top-left corner)
+        if self.health_bar_sheet is None:
+            self.health_bar_sheet = build_health_bar_sheet()
+        sheet = self.health_bar_sheet
+        offset_x, offset_y = offset.x, offset.y
+        width, height = surface.get_size()
+        # The view reaches a little above the screen so bars of sprites just above it still show
+        view = pygame.Rect(offset_x, offset_y - HEALTH_BAR_OFFSET_Y - HEALTH_BAR_HEIGHT, width,
+                           height + HEALTH_BAR_OFFSET_Y + HEALTH_BAR_HEIGHT)
+        visible = view.colliderect
+        for layer in self.layer_order:
+            sprites = [sprite for sprite in self.layers[layer] if visible(sprite.rect)]
+            if not sprites: continue
+            surface.blits([(sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y)) for sprite in sprites], False)
+            bars = [(sheet, (sprite.rect.x - offset_x, sprite.rect.bottom + HEALTH_BAR_OFFSET_Y - offset_y),
+                     (0, sprite.health_bar_fill() * HEALTH_BAR_HEIGHT, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT))
+                    for sprite in sprites if hasattr(sprite, 'health_bar_fill')]
+            if bars:
+                surface.blits(bars, False)
+
+def build_health_bar_sheet():
+    # Row i is a health bar filled i pixels wide (0..HEALTH_BAR_WIDTH), drawn like Enemy.draw_health_bar
+    sheet = pygame.Surface((HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT * (HEALTH_BAR_WIDTH + 1)))
+    for fill in range(HEALTH_BAR_WIDTH + 1):
+        background = pygame.Rect(0, fill * HEALTH_BAR_HEIGHT, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT)
+        pygame.draw.rect(sheet, HEALTH_BG_COLOR, background)
+        pygame.draw.rect(sheet, HEALTH_COLOR, (0, background.top, fill, HEALTH_BAR_HEIGHT))
+        pygame.draw.rect(sheet, HEALTH_BORDER_COLOR, background, 1)
+    return sheet
+
+class HashedGroup(pygame.sprite.Group):
+    # Group that buckets its members' rects in a spatial hash, so collision checks only look at nearby sprites
+    def __init__(self, *sprites):
+        self.spatial_hash = SpatialHash()
+        self.version = 0  # bumped on every membership change, lets caches of the group's layout go stale
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if hasattr(sprite, 'rect'):
+            self.spatial_hash.insert(sprite, sprite.rect)
+        self.version += 1
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.spatial_hash.remove(sprite)
+        self.version += 1
+
+    def relocate(self, sprite):
+        # Call after a member moves
+        self.spatial_hash.update(sprite, sprite.rect)
+
+    def query(self, rect):
+        # Broadphase candidates near rect; callers still do the exact rect test
+        return self.spatial_hash.query(rect)
+
+class StaticGroup(pygame.sprite.Group):
+    # Walls and rocks. Nothing in it moves, so instead of testing sprites the game queries collision_map,
+    # which is compiled from the members' rects and rebuilt lazily after the membership changes.
+    def __init__(self, *sprites):
+        self.version = 0  # bumped on every membership change, lets caches of the group's layout go stale
+        self.map_version = None
+        self.static_map = None
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.version += 1
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.version += 1
+
+    @property
+    def collision_map(self):
+        if self.map_version != self.version:
+            self.static_map = StaticCollisionMap([sprite.rect for sprite in self])
+            self.map_version = self.version
+        return self.static_map
+
+class EnemyGroup(HashedGroup):
+    # Enemy sprites plus the EnemyStore holding their state; group membership is store membership
+    def __init__(self, *sprites):
+        self.store = EnemyStore()
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.store.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.store.remove(sprite)
+
+    def update(self, dt):
+        # One batched AI/movement step for every enemy (their own update() does nothing)
+        self.store.update(dt, self)
@@ -0,0 +1,220 @@
+# layouts.py
+import glob
+import hashlib
+import os
+import struct
+import tempfile
+import numpy as np
+from collections import OrderedDict
+from settings import TILE_SIZE, WIDTH, HEIGHT
+from sprites import Rock, Enemy_Greed, Spider, Coin
+
+LAYOUTS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layouts')
+COMPILED_NAME = 'layouts.bin'
+LAYOUTS_MAGIC = b'ILAY'
+LAYOUTS_VERSION = 2
+HEADER = struct.Struct('<4sHII20s')  # magic, version, layout count, object count, digest of the source files
+LAYOUT_BYTES = 1 + 1 + 4 + 4  # door mask, difficulty, first object, object count
+OBJECT_BYTES = 1 + 2 + 2      # type id, grid x, grid y
+MAX_CACHED_LAYOUTS = 256
+ROOM_COLUMNS = WIDTH // TILE_SIZE  # editor grid, objects must lie inside it
+ROOM_ROWS = HEIGHT // TILE_SIZE
+
+# Object type ids in the compiled format ('wall' is what the editor calls a placed Rock)
+TYPE_IDS = {'rock': 0, 'wall': 0, 'enemy_greed': 1, 'spider': 2, 'coin': 3}
+TYPE_ROCK = 0
+TYPE_ENEMY_GREED = 1
+TYPE_SPIDER = 2
+TYPE_COIN = 3
+
+ANY_DOOR_MASK = 255   # layouts saved before door masks were recorded: fit any room, used as a fallback
+MAX_DIFFICULTY = 3
+
+
+def layout_difficulty(objects):
+    # Difficulty tier from the number of enemies: 0 none, 1 up to 2, 2 up to 5, 3 more
+    enemies = sum(1 for obj in objects if obj['type'] in ('enemy_greed', 'spider'))
+    if enemies == 0: return 0
+    if enemies <= 2: return 1
+    if enemies <= 5: return 2
+    return MAX_DIFFICULTY
+
+
+def layout_sources(folder):
+    return sorted(glob.glob(os.path.join(folder, '*.json')))
+
+
+def sources_digest(paths):
+    # Identifies the set of JSON files a compiled file was built from (names, sizes, mtimes):
+    # an added, edited or deleted layout changes it
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return digest.digest()
+
+
+def read_layout(path):
+    # (door mask, difficulty, known objects) of one editor save; ValueError when it cannot be packed
+    import json  # only needed when recompiling, a fresh layouts.bin loads without it
+    with open(path) as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or not isinstance(data.get('objects', []), list):
+        raise ValueError("not a layout object")
+    objects = [obj for obj in data.get('objects', []) if isinstance(obj, dict) and obj.get('type') in TYPE_IDS]
+    for obj in objects:
+        grid_x, grid_y = obj.get('grid_x'), obj.get('grid_y')
+        if type(grid_x) is not int or type(grid_y) is not int:
+            raise ValueError(f"non-integer cell ({grid_x!r}, {grid_y!r})")
+        if not (0 <= grid_x < ROOM_COLUMNS and 0 <= grid_y < ROOM_ROWS):
+            raise ValueError(f"cell ({grid_x}, {grid_y}) outside the room")
+    door_mask = data.get('door_mask', ANY_DOOR_MASK)
+    difficulty = data.get('difficulty', layout_difficulty(objects))
+    if type(door_mask) is not int or not 0 <= door_mask <= ANY_DOOR_MASK:
+        raise ValueError(f"bad door mask {door_mask!r}")
+    if type(difficulty) is not int or not 0 <= difficulty <= MAX_DIFFICULTY:
+        raise ValueError(f"bad difficulty {difficulty!r}")
+    return door_mask, difficulty, objects
+
+
+def compile_layouts(folder=LAYOUTS_FOLDER, output=None):
+    # Pack every layouts/*.json into one binary: per-layout index arrays (door mask, difficulty,
+    # first object, object count) followed by per-object arrays (type id, grid x, grid y).
+    # Files that do not parse are skipped with a warning, the rest still compile.
+    # Written to a temporary file and renamed into place, so readers never see a partial file.
+    output = output or os.path.join(folder, COMPILED_NAME)
+    paths = layout_sources(folder)
+    masks, difficulties, starts, lengths = [], [], [], []
+    types, grid_xs, grid_ys = [], [], []
+    for path in paths:
+        try:
+            door_mask, difficulty, objects = read_layout(path)
+        except (OSError, ValueError, KeyError, TypeError) as error:  # half-written or hand-edited file
+            print(f"Warning: skipping layout {os.path.basename(path)}: {error}")
+            continue
+        masks.append(door_mask)
+        difficulties.append(difficulty)
+        starts.append(len(types))
+        lengths.append(len(objects))
+        for obj in objects:
+            types.append(TYPE_IDS[obj['type']])
+            grid_xs.append(obj['grid_x'])
+            grid_ys.append(obj['grid_y'])
+
+    handle, temporary = tempfile.mkstemp(prefix=COMPILED_NAME, dir=os.path.dirname(os.path.abspath(output)))
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(HEADER.pack(LAYOUTS_MAGIC, LAYOUTS_VERSION, len(masks), len(types), sources_digest(paths)))
+            for values, dtype in ((masks, np.uint8), (difficulties, np.uint8), (starts, np.uint32), (lengths, np.uint32),
+                                  (types, np.uint8), (grid_xs, np.int16), (grid_ys, np.int16)):
+                file.write(np.asarray(values, dtype=dtype).tobytes())
+        os.replace(temporary, output)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return output
+
+
+class LayoutLibrary:
+    # Compiled room layouts. The index arrays are read into memory, the object arrays are memory-mapped,
+    # and decoded layouts (ready to instantiate) are kept in a bounded LRU.
+    def __init__(self, path, digest=None, max_cached=MAX_CACHED_LAYOUTS):
+        # digest: expected sources_digest, ValueError when the file was built from other sources
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, count, objects, sources = HEADER.unpack(header)
+        if magic != LAYOUTS_MAGIC or version != LAYOUTS_VERSION:
+            raise ValueError(f"{path} is not a version {LAYOUTS_VERSION} compiled layout file")
+        if os.path.getsize(path) != HEADER.size + count * LAYOUT_BYTES + objects * OBJECT_BYTES:
+            raise ValueError(f"{path} does not match its header")
+        if digest is not None and sources != digest:
+            raise ValueError(f"{path} was compiled from other layout files")
+        offset = HEADER.size
+        arrays = {}
+        for name, dtype, size in (('door_mask', np.uint8, count), ('difficulty', np.uint8, count),
+                                  ('start', np.uint32, count), ('length', np.uint32, count),
+                                  ('type', np.uint8, objects), ('grid_x', np.int16, objects), ('grid_y', np.int16, objects)):
+            if size:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size,))
+            else:
+                arrays[name] = np.zeros(0, dtype=dtype)
+            offset += size * np.dtype(dtype).itemsize
+        self.count = count
+        self.door_mask = np.array(arrays['door_mask'])
+        self.difficulty = np.array(arrays['difficulty'])
+        self.start = np.array(arrays['start'])
+        self.length = np.array(arrays['length'])
+        self.types, self.grid_x, self.grid_y = arrays['type'], arrays['grid_x'], arrays['grid_y']
+
+        # (door mask, difficulty) -> layout ids
+        self.index = {}
+        for layout_id, key in enumerate(zip(self.door_mask.tolist(), self.difficulty.tolist())):
+            self.index.setdefault(key, []).append(layout_id)
+        self.max_cached = max_cached
+        self.cache = OrderedDict()
+
+    @classmethod
+    def load(cls, folder=LAYOUTS_FOLDER):
+        # Recompiles when the compiled file is missing, damaged, or built from a different set of JSON
+        # files (added, edited or deleted); None when there are no layouts or they cannot be compiled
+        paths = layout_sources(folder)
+        if not paths: return None
+        compiled = os.path.join(folder, COMPILED_NAME)
+        digest = sources_digest(paths)
+        try:
+            return cls(compiled, digest)
+        except (OSError, ValueError):
+            pass
+        try:
+            compile_layouts(folder, compiled)
+            return cls(compiled)
+        except (OSError, ValueError) as error:
+            print(f"Warning: room layouts unavailable: {error}")
+            return None
+
+    def choose(self, door_mask, difficulty, key):
+        # Deterministic pick for a room: the hardest tier up to `difficulty` with layouts for this door
+        # mask, then layouts that fit any mask; key spreads rooms over the candidates. None if nothing fits.
+        for mask in (door_mask, ANY_DOOR_MASK):
+            for tier in range(min(difficulty, MAX_DIFFICULTY), -1, -1):
+                candidates = self.index.get((mask, tier))
+                if candidates:
+                    return candidates[key % len(candidates)]
+        return None
+
+    def get(self, layout_id):
+        # -> (type ids, grid xs, grid ys) as lists
+        layout = self.cache.get(layout_id)
+        if layout is not None:
+            self.cache.move_to_end(layout_id)
+            return layout
+        start = int(self.start[layout_id])
+        end = start + int(self.length[layout_id])
+        layout = (self.types[start:end].tolist(), self.grid_x[start:end].tolist(), self.grid_y[start:end].tolist())
+        self.cache[layout_id] = layout
+        if len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+        return layout
+
+
+def room_difficulty(dungeon, room):
+    # Farther from the start room means harder layouts
+    return min(dungeon.get_analysis().distance(room), MAX_DIFFICULTY)
+
+
+def spawn_layout(game, room, layout, spawn_enemies=True):
+    # Instantiate one decoded layout in a room; everything joins game.room_sprites, which is killed on exit.
+    # Rocks stay out of all_sprites, Game.bake_room draws them into the room surface.
+    types, grid_xs, grid_ys = layout
+    for type_id, grid_x, grid_y in zip(types, grid_xs, grid_ys):
+        pos = (room.world_x + grid_x * TILE_SIZE + TILE_SIZE // 2, room.world_y + grid_y * TILE_SIZE + TILE_SIZE // 2)
+        if type_id == TYPE_ROCK:
+            Rock(pos, (game.collision_sprites, game.room_sprites), game.collision_sprites)  # drawn baked into the room
+        elif type_id == TYPE_COIN:
+            Coin(pos, (game.all_sprites, game.item_sprites, game.room_sprites))
+        elif spawn_enemies:
+            enemy_class = Enemy_Greed if type_id == TYPE_ENEMY_GREED else Spider
+            enemy_class(pos, (game.all_sprites, game.enemy_sprites, game.room_sprites), game.collision_sprites,
+                        game.player, game.enemy_sprites)
@@ -1,13 +1,73 @@
 # level_editor.py
 import time
+import pygame_env
 import pygame
 from settings import *
 from sprites import CollisionSprite, Enemy_Greed, Rock, Coin, Spider
 from player import Player # <<< --- FIX 1: Import Player --- >>>
+from proceduralboxestest import room_door_mask
+from layouts import layout_difficulty
 import numpy as np
 import json
 import os
 
+EMPTY_CELL = -1
+WALL_CELL = -2
+
+
+class OccupancyGrid:
+    # What fills each tile of one room: EMPTY_CELL, WALL_CELL or an index into LevelEditor.object_types,
+    # plus the sprite standing in every object cell, so checks, placement and removal never scan sprites
+    def __init__(self, width, height):
+        self.cells = np.full((height, width), EMPTY_CELL, dtype=np.int8)
+        self.sprites = {}  # (x, y) -> sprite
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.cells.shape[1] and 0 <= y < self.cells.shape[0]
+
+    def is_free(self, x, y):
+        return self.cells[y, x] == EMPTY_CELL
+
+    def put(self, x, y, type_index, sprite):
+        self.cells[y, x] = type_index
+        self.sprites[(x, y)] = sprite
+
+    def take(self, x, y):
+        # -> the sprite in the cell (None for empty and wall cells), which becomes empty
+        sprite = self.sprites.pop((x, y), None)
+        if sprite is not None: self.cells[y, x] = EMPTY_CELL
+        return sprite
+
+    def block_border(self):
+        # The outer ring of cells is room wall or doorway; objects there would be stuck or block a door
+        self.cells[[0, -1], :] = WALL_CELL
+        self.cells[:, [0, -1]] = WALL_CELL
+
+    def free_cells(self, x0, y0, x1, y1):
+        ys, xs = np.nonzero(self.cells[y0:y1 + 1, x0:x1 + 1] == EMPTY_CELL)
+        return list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+
+    def object_cells(self, x0, y0, x1, y1):
+        ys, xs = np.nonzero(self.cells[y0:y1 + 1, x0:x1 + 1] >= 0)
+        return list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+
+    def flood_region(self, x, y):
+        # Empty cells 4-connected to (x, y), bounded by walls, objects and the grid edge
+        if self.cells[y, x] != EMPTY_CELL: return []
+        empty = (self.cells == EMPTY_CELL).tolist()
+        height, width = self.cells.shape
+        empty[y][x] = False
+        region, stack = [(x, y)], [(x, y)]
+        while stack:
+            cx, cy = stack.pop()
+            for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                if 0 <= nx < width and 0 <= ny < height and empty[ny][nx]:
+                    empty[ny][nx] = False
+                    region.append((nx, ny))
+                    stack.append((nx, ny))
+        return region
+
+
 class LevelEditor:
     def __init__(self, game):
         # Kept original init
@@ -31,13 +91,52 @@ class LevelEditor:
         self.ui_text_surface = None
         self.ui_text_rect = None
         self.last_action_time = 0
+        self.occupancy = None       # OccupancyGrid of occupancy_room, see build_occupancy
+        self.occupancy_room = None
+        self.drag_start = None      # (cell, mouse button) while a Shift rectangle is dragged out
+        self.fill_color = (80, 200, 80)
+        self.clear_color = (220, 70, 70)
         self.action_cooldown = 200
         self.update_ui()
 
-    def toggle_editor(self): # Kept original
+    def toggle_editor(self):
         self.editor_active = not self.editor_active
+        self.drag_start = None
+        # Things moved and died while the game ran, so the grid is re-indexed on every activation
+        if self.editor_active: self.build_occupancy()
         print("Editor Activated" if self.editor_active else "Editor Deactivated")
 
+    def build_occupancy(self):
+        # One pass over the sprites of the current room; afterwards every edit keeps the grid in step
+        room = self.game.current_room
+        self.occupancy = OccupancyGrid(self.grid_width, self.grid_height)
+        self.occupancy_room = room
+        self.occupancy.block_border()
+        if room is None: return
+        for sprite in self.placed_sprites():
+            type_key = self.object_type_of(sprite)
+            if type_key is None: continue
+            cell = ((sprite.rect.centerx - room.world_x) // self.tile_size, (sprite.rect.centery - room.world_y) // self.tile_size)
+            if self.occupancy.in_bounds(*cell) and self.occupancy.is_free(*cell):
+                self.occupancy.put(*cell, self.object_types.index(type_key), sprite)
+
+    def placed_sprites(self):
+        # Everything the editor can place: rocks are only in collision_sprites (they are baked into the room
+        # surface, not drawn as sprites), the rest is in all_sprites
+        return [sprite for sprite in self.game.collision_sprites if isinstance(sprite, Rock)] + list(self.game.all_sprites)
+
+    def get_occupancy(self):
+        if self.occupancy is None or self.occupancy_room is not self.game.current_room: self.build_occupancy()
+        return self.occupancy
+
+    def object_type_of(self, sprite):
+        # Editor type of a placeable sprite, None for the player and room walls
+        if isinstance(sprite, Rock): return 'rock'
+        if isinstance(sprite, (Player, CollisionSprite)): return None
+        for type_key, cls in self.type_to_class.items():
+            if isinstance(sprite, cls): return type_key
+        return None
+
     def draw_grid(self): # Kept original
         if not self.grid_active or not self.editor_active: return
         display_surface = self.game.screen
@@ -46,80 +145,109 @@ class LevelEditor:
         start_y = int(-self.game.camera_offset.y % self.tile_size)
         for y in range(start_y, HEIGHT + 1, self.tile_size): pygame.draw.line(display_surface, self.grid_color, (0, y), (WIDTH, y))
 
-    def run(self, dt): # Kept original
+    def draw_selection(self):
+        # Outline of the rectangle being dragged out with Shift
+        if self.drag_start is None or self.game.current_room is None: return
+        (x0, y0, x1, y1) = self.drag_bounds(self.drag_start[0], self.screen_to_cell(pygame.mouse.get_pos()))
+        room = self.game.current_room
+        left = room.world_x + x0 * self.tile_size - self.game.camera_offset.x
+        top = room.world_y + y0 * self.tile_size - self.game.camera_offset.y
+        color = self.fill_color if self.drag_start[1] == 1 else self.clear_color
+        pygame.draw.rect(self.game.screen, color, (left, top, (x1 - x0 + 1) * self.tile_size, (y1 - y0 + 1) * self.tile_size), 3)
+
+    def run(self, dt):
         if self.editor_active:
             self.draw_grid()
+            self.draw_selection()
             self.draw_ui()
 
-    def handle_editor_event(self, event): # Kept original
+    def handle_editor_event(self, event):
+        # Left click places, right click removes. Shift + drag fills (left) or clears (right) a rectangle,
+        # F flood-fills the empty area under the cursor with the selected object.
         if not self.editor_active: return
         current_time = pygame.time.get_ticks()
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_x and current_time - self.last_action_time > self.action_cooldown: self.change_object_type(1); self.last_action_time = current_time
             elif event.key == pygame.K_z and current_time - self.last_action_time > self.action_cooldown: self.change_object_type(-1); self.last_action_time = current_time
             elif event.key == pygame.K_s: self.save_room_template()
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1: self.place_object(event.pos)
-            elif event.button == 3: self.remove_object(event.pos)
+            elif event.key == pygame.K_f: self.flood_fill(pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3):
+            if pygame.key.get_mods() & pygame.KMOD_SHIFT: self.drag_start = (self.screen_to_cell(event.pos), event.button)
+            elif event.button == 1: self.place_object(event.pos)
+            else: self.remove_object(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP and self.drag_start is not None and event.button == self.drag_start[1]:
+            start_cell, button = self.drag_start
+            self.drag_start = None
+            bounds = self.drag_bounds(start_cell, self.screen_to_cell(event.pos))
+            if button == 1: self.fill_rect(*bounds)
+            else: self.clear_region(*bounds)
 
-    def place_object(self, mouse_pos_screen):
-        # Kept original coordinate conversion
+    def screen_to_cell(self, mouse_pos_screen):
+        room = self.game.current_room
         mouse_x_world = mouse_pos_screen[0] + self.game.camera_offset.x
         mouse_y_world = mouse_pos_screen[1] + self.game.camera_offset.y
-        grid_x_world = (mouse_x_world // self.tile_size) * self.tile_size
-        grid_y_world = (mouse_y_world // self.tile_size) * self.tile_size
-        center_x_world = grid_x_world + self.tile_size // 2
-        center_y_world = grid_y_world + self.tile_size // 2
-        pos_world = (center_x_world, center_y_world)
+        return (int(mouse_x_world - room.world_x) // self.tile_size, int(mouse_y_world - room.world_y) // self.tile_size)
+
+    def drag_bounds(self, start_cell, end_cell):
+        # -> (x0, y0, x1, y1), inclusive and clamped to the room grid
+        x0, x1 = sorted((start_cell[0], end_cell[0]))
+        y0, y1 = sorted((start_cell[1], end_cell[1]))
+        return (max(x0, 0), max(y0, 0), min(x1, self.grid_width - 1), min(y1, self.grid_height - 1))
+
+    def cell_center(self, cell):
+        room = self.game.current_room
+        return (room.world_x + cell[0] * self.tile_size + self.tile_size // 2, room.world_y + cell[1] * self.tile_size + self.tile_size // 2)
+
+    def spawn_object(self, object_type, pos_world):
+        # Placed objects belong to the room like layout objects (room_sprites), so they go away when it is left
+        game = self.game
+        if object_type in ('wall', 'rock'): return Rock(pos_world, (game.collision_sprites, game.room_sprites), game.collision_sprites)
+        if object_type == 'enemy_greed': return Enemy_Greed(pos_world, (game.all_sprites, game.enemy_sprites, game.room_sprites), game.collision_sprites, game.player, game.enemy_sprites)
+        if object_type == 'spider': return Spider(pos_world, (game.all_sprites, game.enemy_sprites, game.room_sprites), game.collision_sprites, game.player, game.enemy_sprites)
+        if object_type == 'coin': return Coin(pos_world, (game.all_sprites, game.item_sprites, game.room_sprites))
+        print(f"Warning: Unknown object type '{object_type}'")
+        return None
+
+    def place_at(self, cell):
+        # Place the selected object in a free cell; -> the new sprite, None if the cell is taken
+        occupancy = self.get_occupancy()
+        if not occupancy.in_bounds(*cell) or not occupancy.is_free(*cell): return None
+        sprite = self.spawn_object(self.object_types[self.current_object_type_index], self.cell_center(cell))
+        if sprite is not None: occupancy.put(*cell, self.current_object_type_index, sprite)
+        return sprite
 
+    def place_object(self, mouse_pos_screen):
+        if self.game.current_room is None: return
+        cell = self.screen_to_cell(mouse_pos_screen)
         object_type = self.object_types[self.current_object_type_index]
+        if self.place_at(cell): print(f"Placing {object_type} at cell {cell}")
+        else: print(f"Blocked: cell {cell} is occupied or outside the room")
 
-        # Kept original checks for game attributes
-        if not hasattr(self.game, 'current_room') or self.game.current_room is None: return
-        if not hasattr(self.game, 'player'): return
-        if not hasattr(self.game, 'enemy_sprites'): return
-
-        # Get necessary references (kept original)
-        all_sprites_group = self.game.all_sprites
-        collision_group = self.game.collision_sprites
-        enemy_group = self.game.enemy_sprites # Get enemy group ref
-        player_ref = self.game.player
-
-        # Kept original overlap check
-        for sprite in all_sprites_group:
-             if 'Player' in globals() or 'Player' in locals(): # Check added previously
-                 if sprite.rect.collidepoint(pos_world) and not isinstance(sprite, Player):
-                       print(f"Blocked: Object already exists near {pos_world}")
-                       # return # Original was commented out
-             elif sprite.rect.collidepoint(pos_world):
-                   print(f"Blocked: Object already exists near {pos_world}")
-                   # return # Original was commented out
-
-        print(f"Placing {object_type} at world pos {pos_world}")
-
-        # Instantiate objects
-        if object_type == 'wall': Rock(pos_world, (all_sprites_group, collision_group), collision_group)
-        elif object_type == 'enemy_greed':
-             # <<< --- FIX 2: Pass enemy_group to constructor --- >>>
-             Enemy_Greed(pos_world, (all_sprites_group, enemy_group), collision_group, player_ref, enemy_group)
-        elif object_type == 'spider':
-             # <<< --- FIX 3: Pass enemy_group to constructor --- >>>
-             Spider(pos_world, (all_sprites_group, enemy_group), collision_group, player_ref, enemy_group)
-        elif object_type == 'rock': Rock(pos_world, (all_sprites_group, collision_group), collision_group)
-        elif object_type == 'coin': Coin(pos_world, (all_sprites_group,))
-        else: print(f"Warning: Unknown object type '{object_type}'")
-
-    def remove_object(self, mouse_pos_screen): # Kept original
-        mouse_x_world = mouse_pos_screen[0] + self.game.camera_offset.x
-        mouse_y_world = mouse_pos_screen[1] + self.game.camera_offset.y
-        pos_world = (mouse_x_world, mouse_y_world)
-        sprite_to_remove = None
-        for sprite in self.game.all_sprites:
-             if 'Player' in globals() or 'Player' in locals(): # Check added previously
-                 if not isinstance(sprite, (Player, CollisionSprite)) and sprite.rect.collidepoint(pos_world): sprite_to_remove = sprite; break
-             elif not isinstance(sprite, CollisionSprite) and sprite.rect.collidepoint(pos_world): sprite_to_remove = sprite; break
-        if sprite_to_remove: print(f"Removing {type(sprite_to_remove).__name__} at {pos_world}"); sprite_to_remove.kill()
-        else: print(f"No removable object found at {pos_world}")
+    def remove_object(self, mouse_pos_screen):
+        if self.game.current_room is None: return
+        cell = self.screen_to_cell(mouse_pos_screen)
+        occupancy = self.get_occupancy()
+        sprite = occupancy.take(*cell) if occupancy.in_bounds(*cell) else None
+        if sprite: print(f"Removing {type(sprite).__name__} at cell {cell}"); sprite.kill()
+        else: print(f"No removable object found at cell {cell}")
+
+    def fill_rect(self, x0, y0, x1, y1):
+        placed = sum(1 for cell in self.get_occupancy().free_cells(x0, y0, x1, y1) if self.place_at(cell))
+        print(f"Filled {placed} cells with {self.object_types[self.current_object_type_index]}")
+
+    def clear_region(self, x0, y0, x1, y1):
+        occupancy = self.get_occupancy()
+        cells = occupancy.object_cells(x0, y0, x1, y1)
+        for cell in cells: occupancy.take(*cell).kill()
+        print(f"Cleared {len(cells)} objects")
+
+    def flood_fill(self, mouse_pos_screen):
+        if self.game.current_room is None: return
+        cell = self.screen_to_cell(mouse_pos_screen)
+        occupancy = self.get_occupancy()
+        region = occupancy.flood_region(*cell) if occupancy.in_bounds(*cell) else []
+        placed = sum(1 for region_cell in region if self.place_at(region_cell))
+        print(f"Flood filled {placed} cells with {self.object_types[self.current_object_type_index]}")
 
     def change_object_type(self, direction): # Kept original
         self.current_object_type_index = (self.current_object_type_index + direction) % len(self.object_types)
@@ -146,11 +274,10 @@ class LevelEditor:
         if not hasattr(self.game, 'current_room') or self.game.current_room is None: return
         if filename is None: room_coords = f"{self.game.current_room.grid_x}_{self.game.current_room.grid_y}"; filename = f"room_{room_coords}_{int(time.time())}.json"
         print(f"Attempting to save room layout to {filename}...")
-        room_data = {"objects": []}
+        room_data = {"door_mask": room_door_mask(self.game.current_room), "objects": []}
         room_origin_x = self.game.current_room.world_x
         room_origin_y = self.game.current_room.world_y
-        if 'Player' in globals() or 'Player' in locals(): sprites_to_save = [sprite for sprite in self.game.all_sprites if not isinstance(sprite, (Player, CollisionSprite))]
-        else: sprites_to_save = [sprite for sprite in self.game.all_sprites if not isinstance(sprite, CollisionSprite)]
+        sprites_to_save = [sprite for sprite in self.placed_sprites() if self.object_type_of(sprite) is not None]
         for sprite in sprites_to_save:
             obj_data = None; sprite_type_str = None
             for type_str, cls in self.type_to_class.items():
@@ -163,6 +290,7 @@ class LevelEditor:
                 obj_data = {"type": sprite_type_str, "grid_x": grid_x, "grid_y": grid_y}
             elif sprite_type_str: print(f"Warning: Sprite {sprite} of type {sprite_type_str} lacks 'rect'.")
             if obj_data: room_data["objects"].append(obj_data)
+        room_data["difficulty"] = layout_difficulty(room_data["objects"])
         try:
             layouts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'layouts'); os.makedirs(layouts_dir, exist_ok=True)
             filepath = os.path.join(layouts_dir, filename)
@@ -1,22 +1,62 @@
 # main.py
+import os
+import pygame_env
 import pygame
 import sys
 import random
+import numpy as np
 
 from pygame import K_LEFT
 from settings import *
 from player import Player
 from sprites import *
-from os.path import join, dirname, abspath
-from proceduralboxestest import generate_grid, find_and_set_boss_room, create_room_surface, unload_room_surface, get_room_from_grid
-from level_editor import LevelEditor  # Import the LevelEditor
+from groups import AllSprites, StaticGroup, EnemyGroup
+from renderer import DirtyRectRenderer
+from assets import assets
+from projectiles import TearPool, TEAR_ROTATIONS, TEAR_DOWN, TEAR_RIGHT, TEAR_UP, TEAR_LEFT
+from proceduralboxestest import (generate_grid, place_special_rooms, create_room_surface, room_door_mask,
+                                 bake_room_surface)
+from layouts import LayoutLibrary, room_difficulty, spawn_layout
+from snapshot import take_snapshot, restore_snapshot
+from room_streaming import RoomStreamer
+from profiler import FrameProfiler, NullProfiler
+import simulation
+from simulation import Action, NO_ACTION, SimClock
+
+
+def keyboard_action():
+    # Current keyboard state as an Action (WASD moves, arrows shoot with left > right > up > down priority)
+    keys = pygame.key.get_pressed()
+    move = (int(keys[pygame.K_d]) - int(keys[pygame.K_a]), int(keys[pygame.K_s]) - int(keys[pygame.K_w]))
+    if keys[pygame.K_LEFT]: shoot = (-1, 0)
+    elif keys[pygame.K_RIGHT]: shoot = (1, 0)
+    elif keys[pygame.K_UP]: shoot = (0, -1)
+    elif keys[pygame.K_DOWN]: shoot = (0, 1)
+    else: shoot = (0, 0)
+    return Action(move, shoot)
 
 
 class Game:
-    def __init__(self, WIDTH, HEIGHT):
-        pygame.init()
+    def __init__(self, WIDTH, HEIGHT, headless=False, dirty_rects=False, seed=None):
+        # Headless: no window, no clock throttling, driven one tick at a time through step()
+        # dirty_rects: present only the screen areas that changed instead of the whole window
+        # seed: every dungeon and enemy decision derives from it (drawn from the global random if None).
+        # Any int works: it is wrapped to 0..2**64-1, what the RNG seeds and the replay/snapshot headers take.
+        self.headless = headless
+        self.seed = seed % 2 ** 64 if seed is not None else random.randrange(2 ** 32)
+        self.episode = 0
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            # Only what the simulation needs; full pygame.init() also brings up audio, joysticks etc.
+            pygame.display.init()
+            pygame.font.init()
+        else:
+            pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Issac-Like")
+        if not headless:
+            pygame.display.set_caption("Issac-Like")
+        self.sim_clock = SimClock()
+        simulation.activate(self.sim_clock)
 
         self.clock = pygame.time.Clock()
         self.running = True
@@ -24,21 +64,35 @@ class Game:
         self.load_images()
 
         # Generate level
-        self.grid, self.rooms = generate_grid()
-        find_and_set_boss_room(self.grid, self.rooms)
-        self.current_room = self.rooms[0]
+        self.dungeon = generate_grid(seed=[self.seed, self.episode])
+        place_special_rooms(self.dungeon)
+        self.grid, self.rooms = self.dungeon.grid, self.dungeon.rooms
+        self.current_room = self.dungeon.start_room
         create_room_surface(self.current_room, self.floor_image, self.door_image)  # Load the starting room
 
         # Groups
-        self.all_sprites = pygame.sprite.Group()
-        self.collision_sprites = self.current_room.collision_sprites  # Initial collision sprites
-        self.tear_sprites = pygame.sprite.Group()
-        self.enemy_sprites = pygame.sprite.Group() # <<< --- Line from previous fix --- >>>
+        self.all_sprites = AllSprites() # layered render queue, see groups.py
+        self.collision_sprites = StaticGroup(self.current_room.collision_sprites)  # Initial collision sprites (own group, the room keeps its walls)
+        self.enemy_sprites = EnemyGroup() # <<< --- Line from previous fix --- >>> (owns the batched EnemyStore)
+        self.item_sprites = pygame.sprite.Group() # coins and other pickups
+        self.room_sprites = pygame.sprite.Group() # everything spawned from the current room's layout
+        self.enemy_sprites.store.rng = np.random.default_rng([self.seed, self.episode, 1])
+        self.enemy_sprites.store.verbose = not headless
+
+        self.tears = TearPool(self.tear_images) # every tear lives in this pool's arrays, no tear sprites
 
         # Player setup
         self.player = Player((WIDTH // 2, HEIGHT // 2), self.all_sprites, self.collision_sprites)
         self.all_sprites.add(self.player)
 
+        # Room layouts (layouts/*.json, compiled on first use), None when there are none
+        self.layouts = LayoutLibrary.load()
+        self.populate_room()
+        self.room_streamer = RoomStreamer(self) # prefetches the rooms around the current one under a per-frame budget
+        self.room_streamer.enter(self.current_room)
+        self.baked_room = None  # room whose surface has the rocks drawn in, and the collision_sprites version it shows
+        self.baked_version = None
+
         # Tear timer
         self.can_shoot = True
         self.shoot_time = 0
@@ -57,107 +111,189 @@ class Game:
         self.minimap_scale = 0.20
         self.minimap_x = 10
         self.minimap_y = 10
-        self.grid_width, self.grid_height = self.grid.shape
-        self.room_size_on_minimap = int(min(WIDTH, HEIGHT) * self.minimap_scale / max(self.grid_width, self.grid_height))
         self.current_room_color = (255, 255, 255)
         self.room_color = (100, 100, 100)
         self.door_color = (0, 100, 0)
+        self.minimap_colorkey = (255, 0, 255)
+        self.minimap_base = None      # every room in room_color, rebuilt when the dungeon changes
+        self.minimap_surface = None   # base + current room highlight, rebuilt when current_room changes
+        self.minimap_rooms = None
+        self.minimap_room = None
+        self.build_minimap()
+
+        # Level Editor (imported and built on first TAB, see get_level_editor)
+        self.level_editor = None
+
+        self.renderer = DirtyRectRenderer(self) if dirty_rects else None
+        self.profiler = NullProfiler() # run() swaps in a FrameProfiler, F3 shows its HUD
+
+    @property
+    def editor_active(self):
+        return self.level_editor is not None and self.level_editor.editor_active
+
+    def get_level_editor(self):
+        # Lazy: the editor pulls in json, time and every sprite class, most runs never open it
+        if self.level_editor is None:
+            from level_editor import LevelEditor
+            self.level_editor = LevelEditor(self)  # Pass the Game instance
+        return self.level_editor
+
+    def reset(self):
+        # Start a fresh dungeon in place, reusing the display, images and groups
+        for sprite in self.all_sprites:
+            if sprite is not self.player: sprite.kill()
+        for sprite in self.room_sprites: sprite.kill() # rocks are not in all_sprites
+        self.episode += 1
+        self.dungeon = generate_grid(seed=[self.seed, self.episode])
+        self.enemy_sprites.store.rng = np.random.default_rng([self.seed, self.episode, 1])
+        place_special_rooms(self.dungeon)
+        self.grid, self.rooms = self.dungeon.grid, self.dungeon.rooms
+        self.current_room = self.dungeon.start_room
+        create_room_surface(self.current_room, self.floor_image, self.door_image)
+        self.collision_sprites.empty()
+        self.collision_sprites.add(self.current_room.collision_sprites)
+        self.populate_room()
+        self.room_streamer.enter(self.current_room)
+
+        self.player.rect.center = (WIDTH // 2, HEIGHT // 2)
+        self.player.hitbox_rect.center = self.player.rect.center
+        self.player.direction = pygame.Vector2()
+
+        self.sim_clock.reset()
+        self.tears.clear()
+        self.can_shoot = True
+        self.shoot_time = 0
+        self.transitioning = False
+        self.transition_timer = 0
+        self.running = True
+        self.update_camera()
 
-        # Level Editor
-        self.level_editor = LevelEditor(self)  # Pass the Game instance
+    def populate_room(self, spawn_enemies=None):
+        # Spawn the current room's layout: rocks and coins on every visit, enemies on the first one only.
+        # The layout is picked deterministically from the seed and the room position.
+        room = self.current_room
+        if spawn_enemies is None:
+            spawn_enemies = not room.visited
+        room.visited = True
+        if self.layouts is None or room.start: return
+        # Same layout for the same room on every run with this seed (stream 2, enemies use stream 1)
+        key = int(np.random.default_rng([self.seed, self.episode, 2, room.grid_x, room.grid_y]).integers(2 ** 31))
+        layout_id = self.layouts.choose(room_door_mask(room), room_difficulty(self.dungeon, room), key)
+        if layout_id is not None:
+            spawn_layout(self, room, self.layouts.get(layout_id), spawn_enemies)
+
+    def bake_room(self):
+        # Rocks are part of the current room's surface rather than sprites; redraw it when they change
+        room = self.current_room
+        if (room is self.baked_room and self.collision_sprites.version == self.baked_version) or not room.loaded: return
+        previous = self.baked_room
+        if previous is not None and previous is not room and previous.loaded:
+            previous.surface = previous.background  # its rocks are gone with the room change
+        bake_room_surface(room, [sprite for sprite in self.collision_sprites if isinstance(sprite, Rock)])
+        self.baked_room, self.baked_version = room, self.collision_sprites.version
+
+    def snapshot(self):
+        # Compact bytes of the whole simulation state, see snapshot.py
+        return take_snapshot(self)
+
+    def restore(self, data):
+        # Back to a snapshot without reloading images or rebuilding room surfaces
+        restore_snapshot(self, data)
 
     def load_images(self):
-        # Load assets
-        base_folder = dirname(dirname(abspath(__file__)))
-        flooar_path = join(base_folder, 'images', 'assets', 'floor.png') # Note: 'flooar' typo is kept from original file
-        door_path = join(base_folder, 'images', 'assets', 'door.png')
-
+        # Load assets (decoded once per process by the asset cache)
         # floor img
         new_width = 1400
         new_height = 800
-        self.floor_image = pygame.image.load(flooar_path).convert()
-        self.floor_image = pygame.transform.scale(self.floor_image, (new_width, new_height))
+        self.floor_image = assets.get('floor.png', size=(new_width, new_height), alpha=False)
 
         # door img
         new_width = 161
         new_height = 86
-        self.door_image = pygame.image.load(door_path).convert_alpha()
-        self.door_image = pygame.transform.scale(self.door_image, (new_width, new_height))
+        self.door_image = assets.get('door.png', size=(new_width, new_height))
 
-        # tear img
-        tear_path = join(base_folder, 'images', 'assets', 'tear.png')
-        self.tear_surf = pygame.image.load(tear_path).convert_alpha()
+        # tear img, one rotated variant per shooting direction
+        self.tear_images = [assets.get('tear.png', scale=0.8, angle=rotation) for rotation in TEAR_ROTATIONS]
 
-    def input(self):
-        keys = pygame.key.get_pressed()
+    def input(self, action=None):
         # --- Player input for shooting is already prevented if editor active ---
-        if self.can_shoot and not self.level_editor.editor_active:
+        if self.can_shoot and not self.editor_active:
+            if action is not None:
+                shoot_x, shoot_y = action.shoot
+                left, right, up, down = shoot_x < 0, shoot_x > 0, shoot_y < 0, shoot_y > 0
+            else:
+                keys = pygame.key.get_pressed()
+                left, right, up, down = keys[pygame.K_LEFT], keys[pygame.K_RIGHT], keys[pygame.K_UP], keys[pygame.K_DOWN]
+
             direction = pygame.math.Vector2(0, 0)
-            rotation = 0
+            variant = TEAR_DOWN
             offset_x = 0
             offset_y = 0
 
-            if keys[pygame.K_LEFT]:
+            if left:
                 direction.x = -1
-                rotation = -90
+                variant = TEAR_LEFT
                 offset_x = -30
-            elif keys[pygame.K_RIGHT]:
+            elif right:
                 direction.x = 1
-                rotation = 90
+                variant = TEAR_RIGHT
                 offset_x = 30
-            elif keys[pygame.K_UP]:
+            elif up:
                 direction.y = -1
-                rotation = 180
+                variant = TEAR_UP
                 offset_y = -30
-            elif keys[pygame.K_DOWN]:
+            elif down:
                 direction.y = 1
-                rotation = 0
+                variant = TEAR_DOWN
                 offset_y = 30
             else:
                 return
 
             if direction.magnitude():
                 pos = self.player.rect.center + self.player.direction * 10
-                rotated_tear_surf = pygame.transform.rotate(self.tear_surf, rotation)
-
                 new_pos = (pos[0] + offset_x, pos[1] + offset_y)
-                scale_factor = 0.8
-                new_width = int(rotated_tear_surf.get_width() * scale_factor)
-                new_height = int(rotated_tear_surf.get_height() * scale_factor)
-                scaled_tear_surf = pygame.transform.scale(rotated_tear_surf, (new_width, new_height))
-
-                # <<< --- Line from previous fix --- >>>
-                Tear(scaled_tear_surf, new_pos, direction, (self.all_sprites, self.tear_sprites),
-                     self.collision_sprites, self.enemy_sprites)
-                print("shoot")
+                self.tears.spawn(new_pos, direction, variant)
+                if not self.headless: print("shoot")
                 self.can_shoot = False
-                self.shoot_time = pygame.time.get_ticks()
+                self.shoot_time = self.sim_clock.get_ticks()
 
     def tear_timer(self):
          # --- Only update tear timer if editor inactive ---
-        if not self.can_shoot and not self.level_editor.editor_active:
-            current_time = pygame.time.get_ticks()
+        if not self.can_shoot and not self.editor_active:
+            current_time = self.sim_clock.get_ticks()
             if current_time - self.shoot_time >= self.tear_cooldown:
                 self.can_shoot = True
 
-    def run(self):
+    def run(self, record=None, profile_csv=None):
+        # record: path of a replay log (replay.py) receiving the seed and every tick's dt and Action
+        # profile_csv: where to write per-phase frame time percentiles on exit
+        recorder = None
+        if record:
+            from replay import ReplayRecorder
+            recorder = ReplayRecorder(record, self.seed)
+        self.profiler = profiler = FrameProfiler()
         while self.running:
+            profiler.start_frame()
             dt = self.clock.tick(60) / 1000
+            profiler.lap('wait')
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_TAB:
-                        self.level_editor.toggle_editor()
+                        self.get_level_editor().toggle_editor()
+                        if recorder and self.editor_active: print("Level editor changes are not recorded, the replay will diverge")
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle_hud()
                 # Pass all events to editor (it checks internally if active)
-                self.level_editor.handle_editor_event(event)
+                if self.level_editor: self.level_editor.handle_editor_event(event)
+            profiler.lap('events')
 
             # --- Game Logic Updates only if editor is NOT active ---
-            if not self.level_editor.editor_active:
-                self.all_sprites.update(dt) # Update player, enemies, tears etc.
-                self.tear_timer()           # Update tear cooldown
-                self.input()                # Handle shooting input
-                self.update(dt)             # Handle transitions, camera updates etc.
+            if not self.editor_active:
+                action = keyboard_action()
+                if recorder: dt, action = recorder.record(dt, action) # stored precision, so the replay sees the same values
+                self.tick(dt, action)
             # ---------------------------------------------------------
 
             # --- Drawing happens regardless of editor state ---
@@ -165,9 +301,39 @@ class Game:
             # if self.level_editor.run is called there
             self.draw()
             # --------------------------------------------------
+            self.room_streamer.pump() # spend some of the time left in the frame loading nearby rooms
+            profiler.lap('streaming')
+            profiler.end_frame()
 
+        if recorder: recorder.close()
+        if profile_csv: profiler.dump_csv(profile_csv)
         pygame.quit()
 
+    def tick(self, dt, action=None):
+        # One fixed simulation step; action=None reads the keyboard
+        simulation.activate(self.sim_clock)
+        self.sim_clock.advance(dt)
+        self.player.action = action
+        profiler = self.profiler
+        self.all_sprites.update(dt) # Update player etc.
+        profiler.lap('sprites_update')
+        self.tears.update(dt, self.collision_sprites, self.enemy_sprites) # All tears in one vectorized step
+        self.enemy_sprites.update(dt) # All enemies in one batched step
+        profiler.lap('collision')
+        self.tear_timer()           # Update tear cooldown
+        self.input(action)          # Handle shooting input
+        profiler.lap('input')
+        self.update(dt)             # Handle transitions, camera updates etc.
+        profiler.lap('camera_transitions')
+
+    def step(self, action=NO_ACTION, dt=1 / FPS):
+        # Headless entry point: advance exactly one tick with an injected Action, no drawing or throttling
+        if not isinstance(action, Action):
+            action = Action(*action)
+        self.tick(dt, action)
+        self.room_streamer.pump() # same per-frame budget as run(), so entering a room never builds its template
+        return self.running
+
     def update(self, dt):
          # --- This method only runs if editor is NOT active (called from run loop) ---
         if not self.transitioning: # and not self.level_editor.editor_active: # Inner check is redundant now
@@ -176,12 +342,11 @@ class Game:
             self.update_camera()
             self.check_room_transition()
         elif self.transitioning:
-            current_time = pygame.time.get_ticks()
+            current_time = self.sim_clock.get_ticks()
             if current_time - self.transition_timer >= self.transition_duration:
                 self.transitioning = False
             # Clearing tears during transition might still be desired
-            for tear in self.tear_sprites:
-                tear.kill()
+            self.tears.clear()
             self.can_shoot = True
         # -------------------------------------------------------------------------
 
@@ -220,21 +385,22 @@ class Game:
         # --- This only runs if editor is NOT active ---
         if not self.transitioning:
             self.transitioning = True
-            self.transition_timer = pygame.time.get_ticks()
+            self.transition_timer = self.sim_clock.get_ticks()
 
             current_grid_x = self.current_room.grid_x
             current_grid_y = self.current_room.grid_y
             new_grid_x = current_grid_x + dx
             new_grid_y = current_grid_y + dy
 
-            new_room = get_room_from_grid(self.rooms, new_grid_x, new_grid_y)
+            new_room = self.dungeon.room_at(new_grid_x, new_grid_y)
             if new_room:
                 # --- Clear enemies/objects from old room before changing ---
                 # (This part needs enemy_sprites group from previous fix)
                 if hasattr(self, 'enemy_sprites'):
                     for enemy in self.enemy_sprites: enemy.kill()
+                for sprite in self.room_sprites: sprite.kill() # rocks and coins of the room layout
                 # Clear tears regardless
-                for tear in self.tear_sprites: tear.kill()
+                self.tears.clear()
                 # ---------------------------------------------------------
 
                 self.current_room = new_room
@@ -245,7 +411,8 @@ class Game:
                 self.collision_sprites.empty()
                 self.collision_sprites.add(self.current_room.collision_sprites)
                 self.player.collision_sprites = self.collision_sprites
-                self.load_adjacent_rooms()
+                self.populate_room()
+                self.room_streamer.enter(self.current_room) # neighbours load over the next frames, far rooms unload
 
                 if dx > 0: self.player.rect.left = self.current_room.rect.left + 50
                 elif dx < 0: self.player.rect.right = self.current_room.rect.right - 50
@@ -256,91 +423,108 @@ class Game:
                 self.update_camera()
         # ------------------------------------------------
 
-    def load_adjacent_rooms(self):
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            grid_x = self.current_room.grid_x + dx
-            grid_y = self.current_room.grid_y + dy
-            adjacent_room = get_room_from_grid(self.rooms, grid_x, grid_y)
-            if adjacent_room and not adjacent_room.loaded:
-                create_room_surface(adjacent_room, self.floor_image, self.door_image)
-
-    def unload_adjacent_rooms(self):
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0), (0, 0)]:
-            grid_x = self.current_room.grid_x + dx
-            grid_y = self.current_room.grid_y + dy
-            adjacent_room = get_room_from_grid(self.rooms, grid_x, grid_y)
-            if adjacent_room and adjacent_room != self.current_room and adjacent_room.loaded:
-                unload_room_surface(adjacent_room)
+    def build_minimap(self):
+        # Pre-render the whole map once per dungeon, sizes follow the grid so large floors still fit
+        self.grid_height, self.grid_width = self.grid.shape
+        self.room_size_on_minimap = max(2, int(min(WIDTH, HEIGHT) * self.minimap_scale / max(self.grid_width, self.grid_height)))
+        size = self.room_size_on_minimap
+        font = pygame.font.Font(None, size) if size >= 6 else None # one font for the whole map, labels skipped when too small
+        s_color = (255, 100, 0)
+        self.minimap_labels = {label: font.render(label, True, s_color) for label in ("S", "B", "$", "T")} if font else {}
+
+        self.minimap_base = pygame.Surface((self.grid_width * size + 1, self.grid_height * size + 1)).convert()
+        self.minimap_base.fill(self.minimap_colorkey)
+        self.minimap_base.set_colorkey(self.minimap_colorkey)
+        for room in self.rooms:
+            self.draw_minimap_room(self.minimap_base, room, self.room_color)
+        self.minimap_rect = self.minimap_base.get_rect(topleft=(self.minimap_x, self.minimap_y))
+        self.minimap_rooms = self.rooms
+        self.minimap_room = None
+
+    def draw_minimap_room(self, surface, room, color):
+        size = self.room_size_on_minimap
+        rect_x = room.grid_x * size
+        rect_y = room.grid_y * size
+        rect = pygame.Rect(rect_x, rect_y, size, size)
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, (0, 0, 0), rect, 1)
+
+        if room.start == True and 'S' in self.minimap_labels:
+            surface.blit(self.minimap_labels['S'], self.minimap_labels['S'].get_rect(center=rect.center))
+        if room.boss == True and 'B' in self.minimap_labels:
+            surface.blit(self.minimap_labels['B'], self.minimap_labels['B'].get_rect(center=rect.center))
+        if room.shop == True and '$' in self.minimap_labels:
+            surface.blit(self.minimap_labels['$'], self.minimap_labels['$'].get_rect(center=rect.center))
+        if room.treasure == True and 'T' in self.minimap_labels:
+            surface.blit(self.minimap_labels['T'], self.minimap_labels['T'].get_rect(center=rect.center))
+
+        door_size = size // 3
+        door_offset = size // 3
+        if door_size < 2: return
+        if room.door_left: pygame.draw.rect(surface, self.door_color, (rect_x, rect_y + door_offset, door_size // 2, door_size))
+        if room.door_right: pygame.draw.rect(surface, self.door_color, (rect_x + size - door_size // 2, rect_y + door_offset, door_size // 2, door_size))
+        if room.door_up: pygame.draw.rect(surface, self.door_color, (rect_x + door_offset, rect_y, door_size, door_size // 2))
+        if room.door_down: pygame.draw.rect(surface, self.door_color, (rect_x + door_offset, rect_y + size - door_size // 2, door_size, door_size // 2))
 
     def draw_minimap(self):
         # --- Minimap drawing already happens only if editor inactive via draw() ---
-        for room in self.rooms:
-            rect_x = self.minimap_x + room.grid_x * self.room_size_on_minimap
-            rect_y = self.minimap_y + room.grid_y * self.room_size_on_minimap
-            rect = pygame.Rect(rect_x, rect_y, self.room_size_on_minimap, self.room_size_on_minimap)
-            rect_border = pygame.Rect(rect_x, rect_y, self.room_size_on_minimap, self.room_size_on_minimap)
-
-            if room == self.current_room:
-                pygame.draw.rect(self.screen, self.current_room_color, rect)
-                pygame.draw.rect(self.screen, (0, 0, 0), rect_border, 1)
-            else:
-                pygame.draw.rect(self.screen, self.room_color, rect, 0)
-                pygame.draw.rect(self.screen, (0, 0, 0), rect_border, 1)
-
-            door_size = self.room_size_on_minimap // 3
-            door_offset = self.room_size_on_minimap // 3
-            font_size = self.room_size_on_minimap
-            font = pygame.font.Font(None, font_size)
-            s_color = (255, 100, 0)
-
-            if room.start == True:
-                s_text = font.render("S", True, s_color)
-                text_rect = s_text.get_rect(center=rect.center)
-                self.screen.blit(s_text, text_rect)
-
-            if room.boss == True:
-                s_text = font.render("B", True, s_color)
-                text_rect = s_text.get_rect(center=rect.center)
-                self.screen.blit(s_text, text_rect)
-
-            if room.door_left: pygame.draw.rect(self.screen, self.door_color, (rect_x, rect_y + door_offset, door_size // 2, door_size))
-            if room.door_right: pygame.draw.rect(self.screen, self.door_color, (rect_x + self.room_size_on_minimap - door_size // 2, rect_y + door_offset, door_size // 2, door_size))
-            if room.door_up: pygame.draw.rect(self.screen, self.door_color, (rect_x + door_offset, rect_y, door_size, door_size // 2))
-            if room.door_down: pygame.draw.rect(self.screen, self.door_color, (rect_x + door_offset, rect_y + self.room_size_on_minimap - door_size // 2, door_size, door_size // 2))
+        # Cached: rebuilt only when the dungeon is regenerated or the current room changes
+        if self.minimap_rooms is not self.rooms:
+            self.build_minimap()
+        if self.minimap_room is not self.current_room:
+            self.minimap_surface = self.minimap_base.copy()
+            self.draw_minimap_room(self.minimap_surface, self.current_room, self.current_room_color)
+            self.minimap_room = self.current_room
+        self.screen.blit(self.minimap_surface, self.minimap_rect)
         # --------------------------------------------------------------------------
 
-    def draw(self):
+    def draw_sprites(self):
+        # --- Draw sprites respecting camera offset: culled, layer by layer, health bars included ---
+        self.all_sprites.draw(self.screen, self.camera_offset)
+        self.tears.draw(self.screen, self.camera_offset)
+
+    def draw_frame(self):
         # --- FIX: Draw game world elements ALWAYS ---
+        profiler = self.profiler
         self.screen.fill((0, 0, 0, 0)) # Keep background clear/fill as original
+        self.bake_room()
         self.current_room.draw(self.screen, self.camera_offset)
-        # --- Draw sprites respecting camera offset ---
-        for sprite in self.all_sprites:
-            # Handle health bar drawing if applicable (from previous changes)
-            if isinstance(sprite, (Enemy_Greed, Spider)) and hasattr(sprite, 'draw_health_bar'):
-                 # Need offset for health bar drawing relative to screen
-                 sprite.draw_health_bar(self.screen, self.camera_offset)
-                 # Draw sprite image after health bar maybe? Or before? Draw after for now.
-                 self.screen.blit(sprite.image, sprite.rect.topleft - self.camera_offset)
-            else:
-                 # Normal sprite drawing
-                 self.screen.blit(sprite.image, sprite.rect.topleft - self.camera_offset)
+        profiler.lap('room_draw')
+        self.draw_sprites()
+        profiler.lap('sprite_blits')
 
         # self.all_sprites.draw(self.screen) # This call likely draws without offset, remove if manually drawing above
         # --------------------------------------------
 
         # --- Draw minimap ALWAYS (unless editor specifically hides it) ---
         self.draw_minimap()
+        profiler.lap('minimap')
         # ---------------------------------------------------------------
 
         # --- Draw Level Editor elements (grid, UI) if active ---
         # This call draws *on top* of the game world elements drawn above
         # The level_editor.run method itself checks if editor is active
-        self.level_editor.run(0) # dt doesn't matter for drawing
+        if self.level_editor: self.level_editor.run(0) # dt doesn't matter for drawing
+        profiler.lap('editor')
         # ---------------------------------------------------------
+        profiler.draw_hud(self.screen)
+        profiler.lap('hud')
 
+    def draw(self):
+        if self.renderer:
+            self.renderer.draw() # dirty-rectangle path, redraws and presents only what changed
+            return
+        self.draw_frame()
         pygame.display.update()
+        self.profiler.lap('display_update')
 
 
 if __name__ == '__main__':
-    game = Game(WIDTH, HEIGHT)
-    game.run()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Issac-Like")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--record', default=None, help="write a replay log of this run (see replay.py)")
+    parser.add_argument('--profile-csv', default=None, help="write per-phase frame time percentiles here on exit")
+    args = parser.parse_args()
+    game = Game(WIDTH, HEIGHT, seed=args.seed)
+    game.run(record=args.record, profile_csv=args.profile_csv)
\ No newline at end of file
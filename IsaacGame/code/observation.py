@@ -0,0 +1,102 @@
+# observation.py
+import numpy as np
+from settings import WIDTH, HEIGHT, TILE_SIZE
+from entities import KIND_GREED, KIND_SPIDER
+
+# The room covers the whole WIDTH x HEIGHT surface; partial tiles on the right/bottom edge count as tiles
+GRID_WIDTH = -(-WIDTH // TILE_SIZE)
+GRID_HEIGHT = -(-HEIGHT // TILE_SIZE)
+
+# Channels of the symbolic observation
+CHANNEL_WALL = 0      # walls and rocks (anything in collision_sprites)
+CHANNEL_DOOR = 1      # open door tiles
+CHANNEL_GREED = 2     # summed hit points of Enemy_Greed per tile
+CHANNEL_SPIDER = 3    # summed hit points of Spiders per tile
+CHANNEL_TEAR = 4      # number of tears per tile
+CHANNEL_COIN = 5      # number of coins per tile
+CHANNEL_PLAYER = 6
+NUM_CHANNELS = 7
+OBS_SHAPE = (NUM_CHANNELS, GRID_HEIGHT, GRID_WIDTH)
+
+
+class SymbolicEncoder:
+    # uint8 (channel, tile_y, tile_x) view of the current room, built from entity state instead of pixels.
+    # Walls, rocks and doors only change with the room or the collision group, so that layer is cached;
+    # enemies, tears, coins and the player are scattered from the store and pool arrays every tick.
+    def __init__(self, game):
+        self.game = game
+        self.static = np.zeros((2, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.static_key = None
+
+    def encode(self, out=None):
+        if out is None:
+            out = np.empty(OBS_SHAPE, dtype=np.uint8)
+        game = self.game
+        room = game.current_room
+        origin = np.array((room.world_x, room.world_y))
+
+        key = (room, game.collision_sprites.version)
+        if key != self.static_key:
+            self.build_static(origin)
+            self.static_key = key
+        out[:CHANNEL_GREED] = self.static
+        out[CHANNEL_GREED:] = 0
+
+        store = game.enemy_sprites.store
+        n = store.count
+        if n:
+            tiles = tile_index(store.pos[:n] - origin)
+            hit_points = np.maximum(store.hit_points[:n], 0)
+            kind = store.kind[:n]
+            for channel, enemy_kind in ((CHANNEL_GREED, KIND_GREED), (CHANNEL_SPIDER, KIND_SPIDER)):
+                mask = kind == enemy_kind
+                scatter_add(out[channel], tiles[mask], hit_points[mask])
+
+        tears = game.tears
+        if tears.count:
+            scatter_add(out[CHANNEL_TEAR], tile_index(tears.pos[:tears.count] - origin))
+
+        if game.item_sprites:
+            centers = np.array([sprite.rect.center for sprite in game.item_sprites], dtype=np.float64)
+            scatter_add(out[CHANNEL_COIN], tile_index(centers - origin))
+
+        player_x, player_y = game.player.hitbox_rect.center
+        tile_x = min(max((player_x - room.world_x) // TILE_SIZE, 0), GRID_WIDTH - 1)
+        tile_y = min(max((player_y - room.world_y) // TILE_SIZE, 0), GRID_HEIGHT - 1)
+        out[CHANNEL_PLAYER, int(tile_y), int(tile_x)] = 1
+        return out
+
+    def build_static(self, origin):
+        # Any overlap marks a tile, so thin walls still show up on the grid
+        self.static[:] = 0
+        walls = self.static[CHANNEL_WALL]
+        origin_x, origin_y = int(origin[0]), int(origin[1])
+        for sprite in self.game.collision_sprites:
+            rect = sprite.rect.move(-origin_x, -origin_y)
+            if rect.width <= 0 or rect.height <= 0: continue
+            x0, y0 = max(rect.left // TILE_SIZE, 0), max(rect.top // TILE_SIZE, 0)
+            x1, y1 = min((rect.right - 1) // TILE_SIZE, GRID_WIDTH - 1), min((rect.bottom - 1) // TILE_SIZE, GRID_HEIGHT - 1)
+            if x0 <= x1 and y0 <= y1:
+                walls[y0:y1 + 1, x0:x1 + 1] = 1
+
+        # Doors: the edge tile in the middle of each open side (where the template cuts the door gap)
+        room = self.game.current_room
+        doors = self.static[CHANNEL_DOOR]
+        if room.door_up: doors[0, (WIDTH // 2) // TILE_SIZE] = 1
+        if room.door_down: doors[-1, (WIDTH // 2) // TILE_SIZE] = 1
+        if room.door_left: doors[(HEIGHT // 2) // TILE_SIZE, 0] = 1
+        if room.door_right: doors[(HEIGHT // 2) // TILE_SIZE, -1] = 1
+
+
+def tile_index(points):
+    # (x, y) room coordinates -> clipped integer (tile_x, tile_y)
+    tiles = np.floor_divide(points, TILE_SIZE).astype(np.int64)
+    np.clip(tiles[:, 0], 0, GRID_WIDTH - 1, out=tiles[:, 0])
+    np.clip(tiles[:, 1], 0, GRID_HEIGHT - 1, out=tiles[:, 1])
+    return tiles
+
+
+def scatter_add(channel, tiles, values=None):
+    # Accumulate values (or counts) per tile and saturate at 255 instead of wrapping around
+    totals = np.bincount(tiles[:, 1] * GRID_WIDTH + tiles[:, 0], weights=values, minlength=channel.size)
+    channel += np.minimum(totals, 255).astype(np.uint8).reshape(channel.shape)
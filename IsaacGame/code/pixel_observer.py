@@ -0,0 +1,110 @@
+# pixel_observer.py
+import pygame_env
+import pygame
+import numpy as np
+from collections import OrderedDict
+from settings import WIDTH, HEIGHT
+from sprites import HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT, HEALTH_BAR_OFFSET_Y, HEALTH_COLOR, HEALTH_BG_COLOR
+
+PIXEL_OBS_SIZE = (140, 80)  # internal resolution, 1/10 of the window
+PIXEL_OBS_STACK = 4
+MAX_CACHED_BACKGROUNDS = 32
+
+
+def frame_buffer_shape(size=PIXEL_OBS_SIZE, stack=PIXEL_OBS_STACK):
+    # (frame, y, x, RGBX) uint8; the 4th byte is padding, use [..., :3] for RGB
+    width, height = size
+    return (stack, height, width, 4)
+
+
+class PixelObserver:
+    # Renders the world straight at a low resolution into a ring of the last `stack` frames.
+    # The ring is one NumPy array and every slot's Surface is built on top of its memory
+    # (image.frombuffer), so blits land in the array: nothing is copied out per step, and the
+    # array can live in shared memory (VecEnv obs_mode='pixels').
+    # Room backgrounds and sprite images are scaled once and cached, sprites are never drawn at full size.
+    def __init__(self, game, size=PIXEL_OBS_SIZE, stack=PIXEL_OBS_STACK, buffer=None):
+        self.game = game
+        self.size = size
+        self.stack = stack
+        self.scale_x = size[0] / WIDTH
+        self.scale_y = size[1] / HEIGHT
+        if buffer is None:
+            buffer = np.zeros(frame_buffer_shape(size, stack), dtype=np.uint8)
+        self.frames = buffer
+        self.surfaces = [pygame.image.frombuffer(self.frames[i], size, 'RGBX') for i in range(stack)]
+        self.latest = stack - 1  # slot of the newest frame, the oldest is latest + 1 (mod stack)
+        self.backgrounds = OrderedDict()
+        self.images = {}
+
+    def scaled_background(self, surface):
+        background = self.backgrounds.get(surface)
+        if background is None:
+            background = pygame.transform.smoothscale(surface, self.size)
+            self.backgrounds[surface] = background
+            if len(self.backgrounds) > MAX_CACHED_BACKGROUNDS:
+                self.backgrounds.popitem(last=False)
+        else:
+            self.backgrounds.move_to_end(surface)
+        return background
+
+    def scaled_image(self, image):
+        # Sprite images are shared (asset cache, tear variants), so this stays small
+        scaled = self.images.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * self.scale_x)), max(1, round(height * self.scale_y)))
+            scaled = self.images[image] = pygame.transform.smoothscale(image, size)
+        return scaled
+
+    def render(self, target):
+        game = self.game
+        room = game.current_room
+        scale_x, scale_y = self.scale_x, self.scale_y
+        offset_x, offset_y = game.camera_offset.x, game.camera_offset.y
+
+        target.fill((0, 0, 0))
+        game.bake_room()
+        if room.loaded:
+            target.blit(self.scaled_background(room.surface), (round((room.world_x - offset_x) * scale_x),
+                                                               round((room.world_y - offset_y) * scale_y)))
+
+        blits = []
+        bars = []
+        for sprite in game.all_sprites.in_draw_order():
+            position = (round((sprite.rect.x - offset_x) * scale_x), round((sprite.rect.y - offset_y) * scale_y))
+            blits.append((self.scaled_image(sprite.image), position))
+            if hasattr(sprite, 'draw_health_bar'):
+                bars.append((position[0], round((sprite.rect.bottom + HEALTH_BAR_OFFSET_Y - offset_y) * scale_y),
+                             max(0, sprite.hit_points) / sprite.max_hit_points))
+        tears = game.tears
+        if tears.count:
+            rects = tears.rects().tolist()
+            for variant, (x, y, _, _) in zip(tears.variant[:tears.count].tolist(), rects):
+                blits.append((self.scaled_image(tears.images[variant]),
+                              (round((x - offset_x) * scale_x), round((y - offset_y) * scale_y))))
+        target.blits(blits, False)
+
+        bar_width = max(1, round(HEALTH_BAR_WIDTH * scale_x))
+        bar_height = max(1, round(HEALTH_BAR_HEIGHT * scale_y))
+        for x, y, ratio in bars:
+            target.fill(HEALTH_BG_COLOR, (x, y, bar_width, bar_height))
+            target.fill(HEALTH_COLOR, (x, y, round(bar_width * ratio), bar_height))
+
+    def observe(self):
+        # Render the current tick into the oldest slot; returns the ring (frames[latest] is newest)
+        self.latest = (self.latest + 1) % self.stack
+        self.render(self.surfaces[self.latest])
+        return self.frames
+
+    def reset(self):
+        # New episode: every slot holds the first frame so the stack carries no stale history
+        self.latest = 0
+        self.render(self.surfaces[0])
+        self.frames[1:] = self.frames[0]
+        return self.frames
+
+    def ordered(self, out=None):
+        # Oldest-to-newest copy of the stack, for consumers that need time order (one small copy)
+        order = [(self.latest + 1 + i) % self.stack for i in range(self.stack)]
+        return np.take(self.frames, order, axis=0, out=out)
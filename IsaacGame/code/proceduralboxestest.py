@@ -2,31 +2,86 @@ import random
 import numpy as np
 from sprites import *
 from settings import *
-from collections import deque
+from collections import deque, namedtuple
+from dungeon_analysis import DungeonAnalysis
 
 class Room():
-    def __init__(self, grid_x, grid_y, start=False, boss=False, shop=False):
+    def __init__(self, grid_x, grid_y, start=False, boss=False, shop=False, treasure=False):
         self.grid_x = grid_x
         self.grid_y = grid_y
         self.start = start
         self.boss = boss
         self.shop = shop
+        self.treasure = treasure
         self.door_left = False
         self.door_right = False
         self.door_up = False
         self.door_down = False
         self.surface = None  # Room surface will be created later
+        self.background = None  # shared template surface, self.surface is a copy of it once rocks are baked in
         self.rect = None  # Room rect will be created later
         self.world_x = 0
         self.world_y = 0
-        self.collision_sprites = pygame.sprite.Group()
+        self.collision_sprites = NO_WALLS
         self.loaded = False  # Track if the room is currently loaded
+        self.visited = False  # Enemies of the room layout only spawn on the first visit
+        self.neighbors = {}  # (dx, dy) -> adjacent Room, filled in by Dungeon
 
     def draw(self, surface, offset):
         if self.loaded:
-            surface.blit(self.surface, (self.world_x - offset.x, self.world_y - offset.y))
-            for sprite in self.collision_sprites:
-                surface.blit(sprite.image, sprite.rect.topleft - offset)
+            surface.blit(self.surface, (self.world_x - offset.x, self.world_y - offset.y))  # walls, doors and rocks are baked in
+# Door bits, 16 combinations in total
+DOOR_LEFT = 1
+DOOR_RIGHT = 2
+DOOR_UP = 4
+DOOR_DOWN = 8
+
+def room_door_mask(room):
+    return ((DOOR_LEFT if room.door_left else 0) | (DOOR_RIGHT if room.door_right else 0) |
+            (DOOR_UP if room.door_up else 0) | (DOOR_DOWN if room.door_down else 0))
+
+class RoomTemplate():
+    # Background surface and wall sprites (one Group, shared by every room using the template) for one door combination
+    def __init__(self, surface, walls):
+        self.surface = surface
+        self.walls = walls
+
+# (door mask, floor image, door image) -> RoomTemplate
+room_templates = {}
+# collision_sprites of every room that is not loaded; shared and never added to
+NO_WALLS = pygame.sprite.Group()
+
+NEIGHBOR_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+class Dungeon():
+    # Generated floor: grid of occupied cells, rooms, and an object array aligned with grid for O(1) lookups
+    def __init__(self, grid, rooms):
+        self.grid = grid
+        self.rooms = rooms
+        self.start_room = rooms[0]
+        self.room_table = np.empty(grid.shape, dtype=object)
+        for room in rooms:
+            self.room_table[room.grid_y, room.grid_x] = room
+        for room in rooms:
+            room.neighbors = {}
+            for dx, dy in NEIGHBOR_OFFSETS:
+                neighbor = self.room_at(room.grid_x + dx, room.grid_y + dy)
+                if neighbor is not None:
+                    room.neighbors[(dx, dy)] = neighbor
+        self.analysis = None
+
+    def get_analysis(self):
+        # Cached; the layout never changes after generation
+        if self.analysis is None:
+            self.analysis = DungeonAnalysis(self)
+        return self.analysis
+
+    def room_at(self, grid_x, grid_y):
+        grid_height, grid_width = self.grid.shape
+        if 0 <= grid_x < grid_width and 0 <= grid_y < grid_height:
+            return self.room_table[grid_y, grid_x]
+        return None
+
 def start_board(known_locations, rooms, HOW_MANY_ROOMS, fixed,fixed_grid_size):
     if not fixed:
         grid_size = HOW_MANY_ROOMS
@@ -99,58 +154,42 @@ def set_room_doors(grid, rooms):
 
 
 
-def check_if_in_grid(grid, newx, newy):
-    grid_height, grid_width = grid.shape
-    if newx >= grid_width or newx < 0:
-        return False
-    if newy >= grid_height or newy < 0:
-        return False
-    return grid[newy][newx] == 1
-
-def find_and_set_boss_room(grid, rooms, how_many_rooms=10):
-    start_x, start_y = -1, -1
-    for room in rooms:
-        if room.start:
-            start_x, start_y = room.grid_x, room.grid_y
-            break
-
-    if start_x == -1:
+def find_and_set_boss_room(dungeon):
+    if not dungeon.start_room.start:
         print("Error: Starting room not found.")
         return
-
-    room_distances = {(start_x, start_y): 0}
-    reached_rooms = {(start_x, start_y)}
-    queue = [(start_x, start_y, 0)]
-    furthest_room = (start_x, start_y)
-    max_distance = 0
-
-    while queue and len(reached_rooms) < how_many_rooms:
-        current_x, current_y, current_distance = queue.pop(0)
-
-
-
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            neighbor_x, neighbor_y = current_x + dx, current_y + dy
-
-            if check_if_in_grid(grid, neighbor_x, neighbor_y) and (neighbor_x, neighbor_y) not in reached_rooms:
-                reached_rooms.add((neighbor_x, neighbor_y))
-                room_distances[(neighbor_x, neighbor_y)] = current_distance + 1
-                queue.append((neighbor_x, neighbor_y, current_distance + 1))
-
-    furthest_room = max(room_distances, key = room_distances.get)
-    #print("Room Distances:", room_distances)
-    #print("Furthest Room:", furthest_room, "Distance:", max_distance)
-
-    for room in rooms:
-        if room.grid_x == furthest_room[0] and room.grid_y == furthest_room[1]:
-            room.boss = True
-            return
-    print("Warning: Furthest room not found in rooms list.")
-
-
-
-
-def generate_grid(HOW_MANY_ROOMS = 10, fixed = True ,fixed_grid_size = 7):
+    dungeon.get_analysis().farthest_room.boss = True
+
+def place_special_rooms(dungeon):
+    # Boss in the farthest room, then shop and treasure in the deepest remaining dead ends
+    find_and_set_boss_room(dungeon)
+    analysis = dungeon.get_analysis()
+    free_dead_ends = analysis.dead_ends_by_distance(exclude=(dungeon.start_room, analysis.farthest_room))
+    if free_dead_ends:
+        free_dead_ends.pop(0).shop = True
+    if free_dead_ends:
+        free_dead_ends.pop(0).treasure = True
+
+class SeedStream():
+    # Uniform floats from a seeded NumPy generator, read in chunks. generate_grid_batch reads the
+    # same per-seed sequence, which is what keeps the batch and single-seed layouts identical.
+    def __init__(self, seed, chunk_size=64):
+        self.generator = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.values = self.generator.random(chunk_size)
+        self.index = 0
+
+    def random(self):
+        if self.index == len(self.values):
+            self.values = self.generator.random(self.chunk_size)
+            self.index = 0
+        value = self.values[self.index]
+        self.index += 1
+        return value
+
+def generate_grid(HOW_MANY_ROOMS = 10, fixed = True ,fixed_grid_size = 7, seed = None):
+    # Every random choice is one rng.random() draw; seed=None keeps using the global random module
+    rng = random if seed is None else SeedStream(seed)
     rooms = []
     known_locations = []
     grid = start_board(known_locations, rooms, HOW_MANY_ROOMS, fixed,fixed_grid_size)
@@ -158,14 +197,14 @@ def generate_grid(HOW_MANY_ROOMS = 10, fixed = True ,fixed_grid_size = 7):
 
     rooms_to_place = HOW_MANY_ROOMS -1
     while rooms_to_place > 0:
-        los_index = random.randint(0, len(known_locations) - 1)
+        los_index = int(rng.random() * len(known_locations))
         current_grid_x, current_grid_y = known_locations[los_index]
 
         placed = False
         attempts = 0
         while not placed and attempts < 10:
             attempts += 1
-            side = random.randint(1, 4)
+            side = 1 + int(rng.random() * 4)
 
             new_grid_x, new_grid_y = current_grid_x, current_grid_y  # Initialize new coordinates
 
@@ -187,13 +226,131 @@ def generate_grid(HOW_MANY_ROOMS = 10, fixed = True ,fixed_grid_size = 7):
                 rooms_to_place -= 1
 
     rooms = set_room_doors(grid, rooms)
-    return grid, rooms
-
-def create_room_surface(room, floor_image, door_image):
-    room.surface = pygame.Surface((WIDTH, HEIGHT)).convert()
-    room.surface.blit(floor_image, (0, 0))
-    room.rect = room.surface.get_rect(topleft=(room.world_x, room.world_y))
-    room.collision_sprites = pygame.sprite.Group()
+    return Dungeon(grid, rooms)
+
+DungeonBatch = namedtuple('DungeonBatch', ['grids', 'door_masks', 'orders', 'boss_positions'])
+
+def generate_grid_batch(seeds, HOW_MANY_ROOMS = 10, fixed = True, fixed_grid_size = 7):
+    # Vectorized generate_grid(seed=s) + find_and_set_boss_room for many seeds at once.
+    # Returns grids (B, S, S), door bitmasks (B, S, S), placement order (B, S, S, -1 = empty)
+    # and boss (x, y) per dungeon; layouts match the single-seed path exactly.
+    batch = len(seeds)
+    size = HOW_MANY_ROOMS if not fixed else fixed_grid_size
+    if batch == 0:
+        return DungeonBatch(np.zeros((0, size, size), dtype=np.uint8), np.zeros((0, size, size), dtype=np.uint8),
+                            np.zeros((0, size, size), dtype=np.int32), np.zeros((0, 2), dtype=np.int64))
+    chunk_size = 64
+    generators = [np.random.default_rng(seed) for seed in seeds]
+    values = np.stack([generator.random(chunk_size) for generator in generators])
+    cursor = np.zeros(batch, dtype=np.int64)
+    b_index = np.arange(batch)
+
+    # Padded by one cell on every side so neighbour lookups never go out of bounds
+    padded = np.zeros((batch, size + 2, size + 2), dtype=np.uint8)
+    orders = np.full((batch, size, size), -1, dtype=np.int32)
+    known_x = np.zeros((batch, HOW_MANY_ROOMS), dtype=np.int64)
+    known_y = np.zeros((batch, HOW_MANY_ROOMS), dtype=np.int64)
+    count = np.ones(batch, dtype=np.int64)
+    known_x[:, 0] = size // 2
+    known_y[:, 0] = size // 2
+    padded[:, size // 2 + 1, size // 2 + 1] = 1
+    orders[:, size // 2, size // 2] = 0
+
+    side_dx = np.array([-1, 1, 0, 0])
+    side_dy = np.array([0, 0, -1, 1])
+
+    def draw(rows):
+        nonlocal values
+        if len(rows) and cursor[rows].max() >= values.shape[1]:
+            values = np.concatenate([values, np.stack([generator.random(chunk_size) for generator in generators])], axis=1)
+        drawn = values[rows, cursor[rows]]
+        cursor[rows] += 1
+        return drawn
+
+    active = count < HOW_MANY_ROOMS
+    while active.any():
+        rows = b_index[active]
+        los_index = (draw(rows) * count[rows]).astype(np.int64)
+        current_x = known_x[rows, los_index]
+        current_y = known_y[rows, los_index]
+        placed = np.zeros(len(rows), dtype=bool)
+        attempts = 0
+        while attempts < 10 and not placed.all():
+            attempts += 1
+            trying = np.flatnonzero(~placed)
+            tr = rows[trying]
+            side = (draw(tr) * 4).astype(np.int64)
+            new_x = current_x[trying] + side_dx[side]
+            new_y = current_y[trying] + side_dy[side]
+            px, py = new_x + 1, new_y + 1
+            inside = (new_x >= 0) & (new_x < size) & (new_y >= 0) & (new_y < size)
+            px = np.clip(px, 1, size)
+            py = np.clip(py, 1, size)
+            down = padded[tr, py + 1, px]
+            up = padded[tr, py - 1, px]
+            right = padded[tr, py, px + 1]
+            left = padded[tr, py, px - 1]
+            squares = (down & right) | (up & right) | (down & left) | (up & left)
+            ok = inside & (padded[tr, py, px] == 0) & (squares == 0)
+
+            done = tr[ok]
+            padded[done, py[ok], px[ok]] = 1
+            orders[done, new_y[ok], new_x[ok]] = count[done]
+            known_x[done, count[done]] = new_x[ok]
+            known_y[done, count[done]] = new_y[ok]
+            count[done] += 1
+            placed[trying[ok]] = True
+        active = count < HOW_MANY_ROOMS
+
+    grids = padded[:, 1:-1, 1:-1].copy()
+    door_masks = ((padded[:, 1:-1, :-2] * DOOR_LEFT) | (padded[:, 1:-1, 2:] * DOOR_RIGHT) |
+                  (padded[:, :-2, 1:-1] * DOOR_UP) | (padded[:, 2:, 1:-1] * DOOR_DOWN)) * grids
+
+    # Boss room: breadth-first distance field by repeated dilation, farthest room, earliest placed on ties
+    distances = np.full(grids.shape, -1, dtype=np.int32)
+    distances[:, size // 2, size // 2] = 0
+    frontier = np.zeros_like(padded)
+    frontier[:, size // 2 + 1, size // 2 + 1] = 1
+    for distance in range(1, HOW_MANY_ROOMS):
+        grown = np.zeros_like(padded)
+        grown[:, 1:-1, 1:-1] = frontier[:, 1:-1, :-2] | frontier[:, 1:-1, 2:] | frontier[:, :-2, 1:-1] | frontier[:, 2:, 1:-1]
+        grown[:, 1:-1, 1:-1] &= grids & (distances < 0)
+        if not grown.any(): break
+        distances[grown[:, 1:-1, 1:-1].astype(bool)] = distance
+        frontier = grown
+    max_distance = distances.reshape(batch, -1).max(axis=1)
+    candidates = np.where(distances == max_distance[:, None, None], orders, np.iinfo(np.int32).max)
+    boss_flat = candidates.reshape(batch, -1).argmin(axis=1)
+    boss_positions = np.stack([boss_flat % size, boss_flat // size], axis=1)
+
+    return DungeonBatch(grids, door_masks.astype(np.uint8), orders, boss_positions)
+
+def dungeon_from_arrays(grid, door_mask, order, boss_position):
+    # Rebuild Room objects (in placement order) for one entry of a DungeonBatch
+    ys, xs = np.nonzero(order >= 0)
+    placement = np.argsort(order[ys, xs])
+    rooms = []
+    for i in placement:
+        room = Room(grid_x=int(xs[i]), grid_y=int(ys[i]))
+        mask = int(door_mask[ys[i], xs[i]])
+        room.door_left = bool(mask & DOOR_LEFT)
+        room.door_right = bool(mask & DOOR_RIGHT)
+        room.door_up = bool(mask & DOOR_UP)
+        room.door_down = bool(mask & DOOR_DOWN)
+        rooms.append(room)
+    rooms[0].start = True
+    dungeon = Dungeon(np.asarray(grid, dtype=int), rooms)
+    dungeon.room_at(int(boss_position[0]), int(boss_position[1])).boss = True
+    return dungeon
+
+def build_room_template(door_mask, floor_image, door_image):
+    door_left = bool(door_mask & DOOR_LEFT)
+    door_right = bool(door_mask & DOOR_RIGHT)
+    door_up = bool(door_mask & DOOR_UP)
+    door_down = bool(door_mask & DOOR_DOWN)
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.blit(floor_image, (0, 0))
+    walls = pygame.sprite.Group()
 
     wall_thickness = 50  # Adjust as needed
     door_width = door_image.get_width()
@@ -207,56 +364,56 @@ def create_room_surface(room, floor_image, door_image):
     horizontal_door_offset = 15
 
     # Top wall
-    if not room.door_up:
-        wall = CollisionSprite((WIDTH // 2, wall_thickness // 2), (WIDTH, wall_thickness), [room.collision_sprites])
+    if not door_up:
+        wall = CollisionSprite((WIDTH // 2, wall_thickness // 2), (WIDTH, wall_thickness), [walls])
     else:
-        wall_left = CollisionSprite((vertical_door_x // 2, wall_thickness // 2), (vertical_door_x, wall_thickness), [room.collision_sprites])
-        wall_right = CollisionSprite((vertical_door_x + door_width + (WIDTH - (vertical_door_x + door_width)) // 2, wall_thickness // 2), (WIDTH - (vertical_door_x + door_width), wall_thickness), [room.collision_sprites])
+        wall_left = CollisionSprite((vertical_door_x // 2, wall_thickness // 2), (vertical_door_x, wall_thickness), [walls])
+        wall_right = CollisionSprite((vertical_door_x + door_width + (WIDTH - (vertical_door_x + door_width)) // 2, wall_thickness // 2), (WIDTH - (vertical_door_x + door_width), wall_thickness), [walls])
 
     # Bottom wall
-    if not room.door_down:
-        wall = CollisionSprite((WIDTH // 2, HEIGHT - wall_thickness // 2), (WIDTH, wall_thickness), [room.collision_sprites])
+    if not door_down:
+        wall = CollisionSprite((WIDTH // 2, HEIGHT - wall_thickness // 2), (WIDTH, wall_thickness), [walls])
     else:
-        wall_left = CollisionSprite((vertical_door_x // 2, HEIGHT - wall_thickness // 2), (vertical_door_x, wall_thickness), [room.collision_sprites])
-        wall_right = CollisionSprite((vertical_door_x + door_width + (WIDTH - (vertical_door_x + door_width)) // 2, HEIGHT - wall_thickness // 2), (WIDTH - (vertical_door_x + door_width), wall_thickness), [room.collision_sprites])
+        wall_left = CollisionSprite((vertical_door_x // 2, HEIGHT - wall_thickness // 2), (vertical_door_x, wall_thickness), [walls])
+        wall_right = CollisionSprite((vertical_door_x + door_width + (WIDTH - (vertical_door_x + door_width)) // 2, HEIGHT - wall_thickness // 2), (WIDTH - (vertical_door_x + door_width), wall_thickness), [walls])
 
     # LEFT WALL
-    if not room.door_left:
+    if not door_left:
         left_wall = CollisionSprite((wall_thickness // 2, HEIGHT // 2), (wall_thickness, HEIGHT),
-                                    [room.collision_sprites])
+                                    [walls])
     else:
         # Wall above the door
         top_height = horizontal_door_y
         wall_up = CollisionSprite((wall_thickness // 2, top_height // 2),
                                   (wall_thickness, top_height),
-                                  [room.collision_sprites])
+                                  [walls])
 
         # Wall below the door
         bottom_y = horizontal_door_y + door_height + 80
         bottom_height = HEIGHT - bottom_y
         wall_down = CollisionSprite((wall_thickness // 2, bottom_y + bottom_height // 2),
                                     (wall_thickness, bottom_height),
-                                    [room.collision_sprites])
+                                    [walls])
 
         # Optional invisible hitbox for the door (used only if needed for door checks)
         door_hitbox_left = CollisionSprite((0, horizontal_door_y), (wall_thickness, door_height), [])
 
         # Draw door image
-        room.surface.blit(pygame.transform.rotate(door_image, 90),
+        surface.blit(pygame.transform.rotate(door_image, 90),
                           (horizontal_door_offset - door_image.get_height() // 2 + wall_thickness // 2,
                            horizontal_door_y))
 
     # RIGHT WALL
-    if not room.door_right:
+    if not door_right:
         right_wall = CollisionSprite((WIDTH - wall_thickness // 2, HEIGHT // 2),
                                      (wall_thickness, HEIGHT),
-                                     [room.collision_sprites])
+                                     [walls])
     else:
         # Wall above the door
         top_height = horizontal_door_y
         wall_up = CollisionSprite((WIDTH - wall_thickness // 2, top_height // 2),
                                   (wall_thickness, top_height),
-                                  [room.collision_sprites])
+                                  [walls])
 
 
         # Wall below the door
@@ -264,43 +421,68 @@ def create_room_surface(room, floor_image, door_image):
         bottom_height = HEIGHT - bottom_y
         wall_down = CollisionSprite((WIDTH - wall_thickness // 2, bottom_y + bottom_height // 2),
                                     (wall_thickness, bottom_height),
-                                    [room.collision_sprites])
+                                    [walls])
 
         # Draw door image
         rotated_door = pygame.transform.rotate(door_image, 90)
-        room.surface.blit(pygame.transform.flip(rotated_door, True, False),
+        surface.blit(pygame.transform.flip(rotated_door, True, False),
                           (
                           WIDTH - rotated_door.get_width() - horizontal_door_offset + door_image.get_height() // 2 - wall_thickness // 2,
                           horizontal_door_y))
 
     # Draw up and down doors
-    if room.door_up:
-        room.surface.blit(pygame.transform.rotate(door_image, 0), (vertical_door_x, 0))
-    if room.door_down:
-        room.surface.blit(pygame.transform.rotate(pygame.transform.flip(door_image, False, True), 0), (vertical_door_x, HEIGHT - door_height))
+    if door_up:
+        surface.blit(pygame.transform.rotate(door_image, 0), (vertical_door_x, 0))
+    if door_down:
+        surface.blit(pygame.transform.rotate(pygame.transform.flip(door_image, False, True), 0), (vertical_door_x, HEIGHT - door_height))
 
+    return RoomTemplate(surface, walls)
+
+def get_room_template(door_mask, floor_image, door_image):
+    key = (door_mask, floor_image, door_image)
+    template = room_templates.get(key)
+    if template is None:
+        template = build_room_template(door_mask, floor_image, door_image)
+        room_templates[key] = template
+    return template
+
+def clear_room_templates():
+    room_templates.clear()
+
+def create_room_surface(room, floor_image, door_image):
+    # Rooms with the same doors share one background surface and one set of wall sprites
+    template = get_room_template(room_door_mask(room), floor_image, door_image)
+    room.background = room.surface = template.surface  # shared, never draw on it
+    room.rect = room.surface.get_rect(topleft=(room.world_x, room.world_y))
+    room.collision_sprites = template.walls  # the template's own group, never modified, so loading creates no groups
     room.loaded = True
     return room
+def bake_room_surface(room, sprites):
+    # Static sprites (rocks) drawn into a private copy of the room background once, instead of every frame.
+    # Without any the room goes back to the shared template surface.
+    if not sprites:
+        room.surface = room.background
+        return room.surface
+    surface = room.background.copy()
+    surface.blits([(sprite.image, (sprite.rect.x - room.world_x, sprite.rect.y - room.world_y)) for sprite in sprites], False)
+    room.surface = surface
+    return surface
+
 def unload_room_surface(room):
     room.surface = None
+    room.background = None
     room.rect = None
-    room.collision_sprites.empty()
+    room.collision_sprites = NO_WALLS  # the wall sprites stay in the template's group only
     room.loaded = False
 
-def get_room_from_grid(rooms, grid_x, grid_y):
+if __name__ == '__main__':
+    dungeon = generate_grid()
+    place_special_rooms(dungeon)
+    grid, rooms = dungeon.grid, dungeon.rooms
+
+    print("Grid:")
+    print(grid)
+
+    print("\nRooms:")
     for room in rooms:
-        if room.grid_x == grid_x and room.grid_y == grid_y:
-            return room
-    return None
-"""
-grid, rooms = generate_grid()
-
-print("Grid:")
-print(grid)
-
-print("\nRooms:")
-for room in rooms:
-    print(f"({room.grid_x}, {room.grid_y}) - Left:{room.door_left}, Right:{room.door_right}, Up:{room.door_up}, Down:{room.door_down}")
-"""
-grid, rooms = generate_grid()
-find_and_set_boss_room(grid,rooms)
+        print(f"({room.grid_x}, {room.grid_y}) - Left:{room.door_left}, Right:{room.door_right}, Up:{room.door_up}, Down:{room.door_down}")
@@ -0,0 +1,95 @@
+# profiler.py
+import csv
+import time
+import pygame_env
+import pygame
+import numpy as np
+
+# Phases of one Game.run frame, in the order they happen
+PHASES = ('wait', 'events', 'sprites_update', 'collision', 'input', 'camera_transitions',
+          'room_draw', 'sprite_blits', 'minimap', 'editor', 'hud', 'display_update', 'streaming')
+PERCENTILES = (50, 90, 99)
+HUD_REFRESH_FRAMES = 15
+HUD_POSITION = (10, 180)
+
+
+class FrameProfiler:
+    # Per-phase frame timings in a fixed-size ring (frame x phase, milliseconds).
+    # lap(phase) charges the time since the previous mark to that phase, so instrumented code only
+    # needs one call after each step; a phase hit several times in a frame accumulates.
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.times = np.zeros((capacity, len(PHASES)), dtype=np.float64)
+        self.phase_index = {phase: i for i, phase in enumerate(PHASES)}
+        self.frames = 0          # frames recorded so far (the ring holds the last `capacity`)
+        self.row = self.times[0]
+        self.mark = time.perf_counter()
+        self.hud_visible = False
+        self.hud_font = None
+        self.hud_lines = []
+        self.hud_rect = pygame.Rect(HUD_POSITION, (0, 0))
+
+    def start_frame(self):
+        self.row = self.times[self.frames % self.capacity]
+        self.row[:] = 0
+        self.mark = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.row[self.phase_index[phase]] += (now - self.mark) * 1000
+        self.mark = now
+
+    def end_frame(self):
+        self.frames += 1
+
+    def recorded(self):
+        return self.times[:min(self.frames, self.capacity)]
+
+    def summary(self):
+        # phase -> (mean, p50, p90, p99, max) in ms over the frames in the ring; 'frame' is the whole loop
+        times = self.recorded()
+        if not len(times):
+            return {}
+        columns = {phase: times[:, i] for i, phase in enumerate(PHASES)}
+        columns['frame'] = times.sum(axis=1)
+        return {phase: (values.mean(), *np.percentile(values, PERCENTILES), values.max())
+                for phase, values in columns.items()}
+
+    def dump_csv(self, path):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['phase', 'mean_ms'] + [f'p{p}_ms' for p in PERCENTILES] + ['max_ms'])
+            for phase, values in self.summary().items():
+                writer.writerow([phase] + [f'{value:.4f}' for value in values])
+
+    def toggle_hud(self):
+        self.hud_visible = not self.hud_visible
+
+    def draw_hud(self, surface):
+        # Text is re-rendered every few frames only, in between the cached lines are blitted
+        if not self.hud_visible: return
+        if self.hud_font is None:
+            self.hud_font = pygame.font.SysFont("monospace", 14)
+        if not self.hud_lines or self.frames % HUD_REFRESH_FRAMES == 0:
+            summary = self.summary()
+            lines = ["phase              mean    p99  (ms)"]
+            lines += [f"{phase:<18}{values[0]:6.2f} {values[3]:6.2f}" for phase, values in summary.items()]
+            self.hud_lines = [self.hud_font.render(line, True, (255, 255, 0), (0, 0, 0)) for line in lines]
+            width = max(line.get_width() for line in self.hud_lines)
+            self.hud_rect = pygame.Rect(HUD_POSITION, (width, sum(line.get_height() for line in self.hud_lines)))
+        y = self.hud_rect.top
+        for line in self.hud_lines:
+            surface.blit(line, (self.hud_rect.left, y))
+            y += line.get_height()
+
+
+class NullProfiler:
+    # Stand-in when nothing is being measured (headless runs, workers); every call is a no-op
+    hud_visible = False
+    hud_rect = pygame.Rect(HUD_POSITION, (0, 0))
+
+    def start_frame(self): pass
+    def lap(self, phase): pass
+    def end_frame(self): pass
+    def toggle_hud(self): pass
+    def draw_hud(self, surface): pass
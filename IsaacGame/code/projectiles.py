@@ -0,0 +1,117 @@
+# projectiles.py
+import numpy as np
+from settings import FPS
+
+TEAR_SPEED = 600
+TEAR_LIFETIME_TICKS = int(1.2 * FPS)  # 1200 ms at the nominal tick rate
+TEAR_DAMAGE = 1
+
+# Image variant per shooting direction (rotation of tear.png)
+TEAR_DOWN = 0
+TEAR_RIGHT = 1
+TEAR_UP = 2
+TEAR_LEFT = 3
+TEAR_ROTATIONS = (0, 90, 180, -90)
+
+# Per-tear arrays of the pool, in a fixed order (compaction and snapshots walk this list)
+TEAR_FIELDS = ('pos', 'velocity', 'age', 'lifetime', 'damage', 'variant')
+
+
+class TearPool:
+    # Every live tear in preallocated arrays: one vectorized step moves, ages and collides all of them.
+    # There are no tear sprites; dead tears are compacted away and their slots reused by the next shot.
+    def __init__(self, images, capacity=128):
+        self.images = images
+        self.sizes = np.array([image.get_size() for image in images], dtype=np.int64)
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        old = getattr(self, 'pos', None)
+        fields = {
+            'pos': ((capacity, 2), np.float64),       # center
+            'velocity': ((capacity, 2), np.float64),
+            'age': ((capacity,), np.int32),           # ticks since the tear was fired
+            'lifetime': ((capacity,), np.int32),
+            'damage': ((capacity,), np.int32),
+            'variant': ((capacity,), np.int8),
+        }
+        for name, (shape, dtype) in fields.items():
+            array = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def spawn(self, pos, direction, variant, speed=TEAR_SPEED, damage=TEAR_DAMAGE, lifetime=TEAR_LIFETIME_TICKS):
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        x, y = direction
+        length = (x * x + y * y) ** 0.5
+        x, y = (x / length, y / length) if length else (0, -1)  # Default if zero vector
+        i = self.count
+        self.pos[i] = pos
+        self.velocity[i] = (x * speed, y * speed)
+        self.age[i] = 0
+        self.lifetime[i] = lifetime
+        self.damage[i] = damage
+        self.variant[i] = variant
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.count = 0
+
+    def rects(self):
+        # (left, top, width, height) per tear, rounded the same way as Rect(center=...)
+        n = self.count
+        size = self.sizes[self.variant[:n]]
+        center = np.rint(self.pos[:n]).astype(np.int64)
+        return np.concatenate((center - size // 2, size), axis=1)
+
+    def update(self, dt, collision_sprites, enemy_sprites):
+        n = self.count
+        if n == 0: return
+        self.pos[:n] += self.velocity[:n] * dt
+        self.age[:n] += 1
+
+        rects = self.rects()
+        dead = self.age[:n] >= self.lifetime[:n]
+        dead |= collision_sprites.collision_map.overlapping(rects)
+
+        # Enemies: a tear damages everything it touches this tick, then disappears.
+        # Tears are applied in firing order, so an enemy killed by one tear can't absorb the next.
+        enemies = list(enemy_sprites.store.sprites)
+        if enemies:
+            hits = overlaps(rects, [enemy.rect for enemy in enemies])
+            hits[dead] = False
+            for i in np.flatnonzero(hits.any(axis=1)).tolist():
+                targets = [enemies[j] for j in np.flatnonzero(hits[i]).tolist() if enemies[j].alive()]
+                if not targets: continue
+                for enemy in targets:
+                    enemy.take_damage(int(self.damage[i]))
+                dead[i] = True
+
+        if dead.any():
+            keep = ~dead
+            alive = int(keep.sum())
+            for name in TEAR_FIELDS:
+                array = getattr(self, name)
+                array[:alive] = array[:n][keep]
+            self.count = alive
+
+    def draw(self, surface, offset):
+        n = self.count
+        if n == 0: return
+        rects = self.rects()
+        topleft = (rects[:, :2] - (int(offset.x), int(offset.y))).tolist()
+        surface.blits([(self.images[variant], position) for variant, position in zip(self.variant[:n].tolist(), topleft)], False)
+
+
+def overlaps(rects, others):
+    # Boolean matrix [tear, other] with the same rules as Rect.colliderect
+    others = np.array([(rect.x, rect.y, rect.w, rect.h) for rect in others], dtype=np.int64)
+    left, top = rects[:, 0:1], rects[:, 1:2]
+    right, bottom = left + rects[:, 2:3], top + rects[:, 3:4]
+    return ((left < others[:, 0] + others[:, 2]) & (others[:, 0] < right)
+            & (top < others[:, 1] + others[:, 3]) & (others[:, 1] < bottom))
@@ -0,0 +1,5 @@
+# pygame_env.py
+# Imported before pygame by every module that uses it, so the pygame support banner never prints,
+# whichever module a worker, tool or test happens to import first
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
@@ -0,0 +1,96 @@
+# renderer.py
+import pygame_env
+import pygame
+from settings import *
+from sprites import HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT, HEALTH_BAR_OFFSET_Y
+
+
+class DirtyRectRenderer:
+    # Optional render path for Game.draw. The room background is static, so each frame only the areas
+    # covered by sprites last frame and this frame are restored from the room surface, sprites are
+    # redrawn on top, and just those rectangles are presented. Anything that moves the whole view
+    # (room change, camera move, editor overlay) falls back to one full redraw.
+    def __init__(self, game):
+        self.game = game
+        self.previous_rects = []
+        self.needs_full_redraw = True
+        self.last_room = None
+        self.last_offset = None
+        self.last_editor_active = False
+        self.last_hud_visible = False
+        self.last_surface = None
+
+    def invalidate(self):
+        self.needs_full_redraw = True
+
+    def sprite_rects(self):
+        offset = self.game.camera_offset
+        rects = []
+        for sprite in self.game.all_sprites:
+            rect = sprite.rect.move(-offset.x, -offset.y)
+            if hasattr(sprite, 'draw_health_bar'):
+                rect.union_ip(pygame.Rect(rect.left, rect.bottom + HEALTH_BAR_OFFSET_Y, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT))
+            rects.append(rect)
+        tears = self.game.tears
+        if tears.count:
+            rects += [pygame.Rect(rect) for rect in (tears.rects() - (int(offset.x), int(offset.y), 0, 0)).tolist()]
+        return rects
+
+    def restore_background(self, rect):
+        game = self.game
+        room = game.current_room
+        game.screen.fill((0, 0, 0), rect)
+        if room.loaded:
+            # Screen position p shows room surface position p + camera offset - room origin
+            area = rect.move(game.camera_offset.x - room.world_x, game.camera_offset.y - room.world_y)
+            game.screen.blit(room.surface, rect.topleft, area)
+
+    def draw(self):
+        game = self.game
+        offset = (game.camera_offset.x, game.camera_offset.y)
+        editor_active = game.editor_active
+        profiler = game.profiler
+        hud_visible = profiler.hud_visible
+        game.bake_room()
+        full = (self.needs_full_redraw or editor_active or self.last_editor_active or hud_visible != self.last_hud_visible
+                or game.current_room is not self.last_room or offset != self.last_offset
+                or game.current_room.surface is not self.last_surface)  # rocks were (re)baked
+        self.last_room = game.current_room
+        self.last_surface = game.current_room.surface
+        self.last_offset = offset
+        self.last_editor_active = editor_active
+        self.last_hud_visible = hud_visible
+
+        if full:
+            self.needs_full_redraw = False
+            game.draw_frame()
+            pygame.display.update()
+            profiler.lap('display_update')
+            self.previous_rects = self.sprite_rects()
+            return
+
+        current_rects = self.sprite_rects()
+        dirty = self.previous_rects + current_rects
+        if hud_visible:
+            dirty.append(profiler.hud_rect.copy())  # the text may shrink, clear last frame's area too
+        for rect in dirty:
+            self.restore_background(rect)
+        profiler.lap('room_draw')
+        game.draw_sprites()
+        profiler.lap('sprite_blits')
+
+        # The minimap sits on top of the world, repaint it if anything underneath changed
+        minimap_rect = game.minimap_rect
+        if minimap_rect.collidelist(dirty) != -1:
+            game.draw_minimap()
+            dirty.append(minimap_rect)
+        profiler.lap('minimap')
+
+        if hud_visible:
+            profiler.draw_hud(game.screen)
+            dirty.append(profiler.hud_rect)
+        profiler.lap('hud')
+
+        pygame.display.update(dirty)
+        profiler.lap('display_update')
+        self.previous_rects = current_rects
@@ -0,0 +1,112 @@
+# replay.py
+# Deterministic recording and replay. A log holds the game seed plus one fixed-size record per tick
+# (dt and the Action); re-simulating it headlessly reproduces the run exactly, as fast as the CPU allows.
+#   python main.py --record run.rpl             # play and record
+#   python replay.py run.rpl [--render-every 60 --frames-dir frames]
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+import numpy as np
+from settings import WIDTH, HEIGHT
+from simulation import Action
+
+REPLAY_MAGIC = b'IRPL'
+REPLAY_VERSION = 1
+HEADER = struct.Struct('<4sHQ')  # magic, version, seed
+TICK_DTYPE = np.dtype([('dt', '<f4'), ('move', '<f4', (2,)), ('shoot', 'i1', (2,))])  # 14 bytes per tick
+
+
+class ReplayRecorder:
+    # Appends ticks to a log, buffered in a structured array and written in blocks.
+    # record() returns dt and the Action at stored precision; the live game must tick with those values.
+    def __init__(self, path, seed, block_size=600):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed))
+        self.block = np.zeros(block_size, dtype=TICK_DTYPE)
+        self.count = 0
+        self.ticks = 0
+
+    def record(self, dt, action):
+        row = self.block[self.count]
+        row['dt'] = dt
+        row['move'] = action.move
+        row['shoot'] = np.sign(action.shoot)
+        self.count += 1
+        self.ticks += 1
+        if self.count == len(self.block):
+            self.flush()
+        return float(row['dt']), Action(tuple(row['move'].tolist()), tuple(row['shoot'].tolist()))
+
+    def flush(self):
+        self.file.write(self.block[:self.count].tobytes())
+        self.count = 0
+
+    def close(self):
+        if self.file.closed: return
+        self.flush()
+        self.file.close()
+
+
+def load_replay(path):
+    # -> (seed, structured array of ticks)
+    with open(path, 'rb') as file:
+        magic, version, seed = HEADER.unpack(file.read(HEADER.size))
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay log")
+        data = file.read()
+    usable = len(data) - len(data) % TICK_DTYPE.itemsize  # a crashed recording may end mid-record
+    return seed, np.frombuffer(data[:usable], dtype=TICK_DTYPE)
+
+
+def replay(path, render_every=0, frames_dir=None):
+    # Re-simulate a log headlessly; only every render_every-th tick is drawn (and saved if frames_dir is set)
+    from main import Game
+    import pygame
+
+    seed, ticks = load_replay(path)
+    game = Game(WIDTH, HEIGHT, headless=True, seed=seed)
+    if frames_dir:
+        os.makedirs(frames_dir, exist_ok=True)
+    tick = 0
+    for tick, (dt, move, shoot) in enumerate(zip(ticks['dt'].tolist(), ticks['move'].tolist(), ticks['shoot'].tolist()), 1):
+        game.tick(dt, Action(tuple(move), tuple(shoot)))
+        if render_every and tick % render_every == 0:
+            game.draw_frame()
+            if frames_dir:
+                pygame.image.save(game.screen, os.path.join(frames_dir, f"frame_{tick:07d}.png"))
+        if not game.running: break
+    return game, tick
+
+
+def state_digest(game):
+    # Short hash of the simulation state, equal digests mean two runs ended in the same place
+    digest = hashlib.sha1()
+    digest.update(struct.pack('<QdII', game.seed, game.sim_clock.ticks, game.current_room.grid_x, game.current_room.grid_y))
+    digest.update(struct.pack('<4i', *game.player.hitbox_rect))
+    store = game.enemy_sprites.store
+    for array in (store.pos, store.direction, store.hit_points, store.state):
+        digest.update(array[:store.count].tobytes())
+    for array in (game.tears.pos, game.tears.age):
+        digest.update(array[:game.tears.count].tobytes())
+    return digest.hexdigest()[:16]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-simulate a replay log headlessly at full speed")
+    parser.add_argument('log')
+    parser.add_argument('--render-every', type=int, default=0, help="draw every N-th tick (0: never)")
+    parser.add_argument('--frames-dir', default=None, help="save the drawn frames as PNGs here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    game, ticks = replay(args.log, args.render_every, args.frames_dir)
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks in {elapsed:.2f} s ({ticks / max(elapsed, 1e-9):.0f} ticks/s), state {state_digest(game)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
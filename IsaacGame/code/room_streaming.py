@@ -0,0 +1,57 @@
+# room_streaming.py
+import time
+from collections import deque
+from proceduralboxestest import create_room_surface, unload_room_surface, room_door_mask, room_templates
+
+
+class RoomStreamer:
+    # Loads the rooms around the current one ahead of time instead of in the frame the player walks
+    # through a door. enter() only queues work; pump() runs once per frame (drawn frames in Game.run,
+    # ticks in Game.step) and loads queued rooms until budget_ms is used up. Loading a room whose
+    # door combination has no background template yet builds that template, the expensive part (a few ms),
+    # so pump() builds at most one template per call and always leaves the rest for later frames.
+    # Rooms more than evict_distance doors away are unloaded.
+    def __init__(self, game, budget_ms=3.0, prefetch_distance=1, evict_distance=2):
+        self.game = game
+        self.budget_ms = budget_ms
+        self.prefetch_distance = prefetch_distance
+        self.evict_distance = evict_distance
+        self.pending = deque()  # rooms to load, nearest first
+
+    def enter(self, room):
+        # The player is now in room: queue what is near, drop what is far
+        distances = rooms_within(room, max(self.prefetch_distance, self.evict_distance))
+        self.pending = deque(other for other, distance in distances.items()
+                             if distance <= self.prefetch_distance and not other.loaded)
+        for other in self.game.rooms:
+            if other.loaded and other not in distances:
+                unload_room_surface(other)
+
+    def pump(self):
+        start = time.perf_counter()
+        built_template = False
+        floor_image, door_image = self.game.floor_image, self.game.door_image
+        while self.pending:
+            room = self.pending[0]
+            if not room.loaded:
+                cached = (room_door_mask(room), floor_image, door_image) in room_templates
+                if not cached and built_template: break  # one template build per frame
+                create_room_surface(room, floor_image, door_image)
+                built_template = built_template or not cached
+            self.pending.popleft()
+            if (time.perf_counter() - start) * 1000 >= self.budget_ms: break
+
+
+def rooms_within(room, max_distance):
+    # Room -> number of doors to walk through from room, for rooms at most max_distance doors away (BFS order)
+    distances = {room: 0}
+    queue = deque([room])
+    while queue:
+        current = queue.popleft()
+        distance = distances[current]
+        if distance == max_distance: continue
+        for neighbor in current.neighbors.values():
+            if neighbor not in distances:
+                distances[neighbor] = distance + 1
+                queue.append(neighbor)
+    return distances
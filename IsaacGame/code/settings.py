@@ -1,3 +1,4 @@
+import pygame_env
 import pygame
 from os.path import join
 from os import walk
@@ -17,7 +18,9 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
+# Render layers of all_sprites, drawn bottom to top (RENDER_LAYER of each sprite class)
+LAYER_ITEMS = 0
+LAYER_ENEMIES = 1
+LAYER_PLAYER = 2
 ROOM_WIDTH_TILES = 10
 ROOM_HEIGHT_TILES = 8
-
-print(nwd(WIDTH,HEIGHT))
\ No newline at end of file
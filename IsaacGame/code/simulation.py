@@ -0,0 +1,38 @@
+# simulation.py
+from collections import namedtuple
+
+# One tick of agent input: move is an (x, y) vector, shoot is a cardinal (x, y) direction or (0, 0)
+Action = namedtuple('Action', ['move', 'shoot'])
+NO_ACTION = Action((0, 0), (0, 0))
+
+
+class SimClock:
+    # Simulation time in milliseconds, advanced by the game loop instead of read from the wall clock.
+    # Timers (tear cooldown, transitions, spider states) use this so headless runs are not tied to real time.
+    def __init__(self):
+        self.ticks = 0
+        self.frame = 0
+
+    def advance(self, dt):
+        self.ticks += dt * 1000
+        self.frame += 1
+
+    def reset(self):
+        self.ticks = 0
+        self.frame = 0
+
+    def get_ticks(self):
+        return int(self.ticks)
+
+
+# The clock of the game currently being ticked; each Game activates its own so several can share a process
+clock = SimClock()
+
+
+def activate(game_clock):
+    global clock
+    clock = game_clock
+
+
+def get_ticks():
+    return clock.get_ticks()
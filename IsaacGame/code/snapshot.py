@@ -0,0 +1,194 @@
+# snapshot.py
+import struct
+import weakref
+import numpy as np
+from entities import ENEMY_FIELDS, KIND_GREED, KIND_SPIDER
+from projectiles import TEAR_FIELDS
+from proceduralboxestest import (Room, Dungeon, DOOR_LEFT, DOOR_RIGHT, DOOR_UP, DOOR_DOWN, room_door_mask,
+                                 create_room_surface)
+from sprites import Enemy_Greed, Spider
+
+SNAPSHOT_MAGIC = b'ISNP'
+SNAPSHOT_VERSION = 2
+HEADER = struct.Struct('<4sH')
+# seed, episode, clock ticks, clock frame, can_shoot, shoot_time, transitioning, transition_timer, running,
+# current room x/y, camera x/y, player hitbox x/y/w/h, player direction x/y
+GAME_STATE = struct.Struct('<QIdQ?q?q?hhdd4idd')
+RNG_STATE = struct.Struct('<16s16sBI')  # PCG64 state, increment, has_uint32, uinteger
+COUNT = struct.Struct('<I')
+ROOM_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2'), ('flags', 'u1'), ('doors', 'u1')])
+
+ROOM_START = 1
+ROOM_BOSS = 2
+ROOM_SHOP = 4
+ROOM_TREASURE = 8
+
+ENEMY_CLASSES = {KIND_GREED: Enemy_Greed, KIND_SPIDER: Spider}
+
+# Dungeon -> its packed bytes; the layout never changes after generation, so it is packed once
+packed_dungeons = weakref.WeakKeyDictionary()
+
+
+def pack_dungeon(dungeon):
+    packed = packed_dungeons.get(dungeon)
+    if packed is None:
+        rooms = np.zeros(len(dungeon.rooms), dtype=ROOM_DTYPE)
+        for i, room in enumerate(dungeon.rooms):  # placement order, rooms[0] is the start room
+            flags = ((ROOM_START if room.start else 0) | (ROOM_BOSS if room.boss else 0) |
+                     (ROOM_SHOP if room.shop else 0) | (ROOM_TREASURE if room.treasure else 0))
+            rooms[i] = (room.grid_x, room.grid_y, flags, room_door_mask(room))
+        height, width = dungeon.grid.shape
+        packed = struct.pack('<HHI', width, height, len(rooms)) + dungeon.grid.astype(np.uint8).tobytes() + rooms.tobytes()
+        packed_dungeons[dungeon] = packed
+    return packed
+
+
+def unpack_dungeon(data):
+    width, height, count = struct.unpack_from('<HHI', data)
+    offset = struct.calcsize('<HHI')
+    grid = np.frombuffer(data, dtype=np.uint8, count=width * height, offset=offset).reshape(height, width).astype(int)
+    records = np.frombuffer(data, dtype=ROOM_DTYPE, count=count, offset=offset + width * height)
+    rooms = []
+    for x, y, flags, doors in records.tolist():
+        room = Room(grid_x=x, grid_y=y, start=bool(flags & ROOM_START), boss=bool(flags & ROOM_BOSS),
+                    shop=bool(flags & ROOM_SHOP), treasure=bool(flags & ROOM_TREASURE))
+        room.door_left = bool(doors & DOOR_LEFT)
+        room.door_right = bool(doors & DOOR_RIGHT)
+        room.door_up = bool(doors & DOOR_UP)
+        room.door_down = bool(doors & DOOR_DOWN)
+        rooms.append(room)
+    dungeon = Dungeon(grid, rooms)
+    packed_dungeons[dungeon] = bytes(data)
+    return dungeon
+
+
+def pack_rng(generator):
+    state = generator.bit_generator.state
+    return RNG_STATE.pack(state['state']['state'].to_bytes(16, 'little'), state['state']['inc'].to_bytes(16, 'little'),
+                          state['has_uint32'], state['uinteger'])
+
+
+def unpack_rng(generator, data):
+    value, increment, has_uint32, uinteger = RNG_STATE.unpack(data)
+    generator.bit_generator.state = {
+        'bit_generator': 'PCG64',
+        'state': {'state': int.from_bytes(value, 'little'), 'inc': int.from_bytes(increment, 'little')},
+        'has_uint32': has_uint32, 'uinteger': uinteger,
+    }
+
+
+def take_snapshot(game):
+    # Full simulation state of a Game as bytes: dungeon layout, visited rooms, current room, player, enemies,
+    # tears, timers, RNG. Rocks and coins follow from the room layout; editor-placed ones are not captured.
+    player = game.player
+    hitbox = player.hitbox_rect
+    store = game.enemy_sprites.store
+    tears = game.tears
+    dungeon = pack_dungeon(game.dungeon)
+    parts = [
+        HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION),
+        GAME_STATE.pack(game.seed, game.episode, game.sim_clock.ticks, game.sim_clock.frame,
+                        game.can_shoot, game.shoot_time, game.transitioning, game.transition_timer, game.running,
+                        game.current_room.grid_x, game.current_room.grid_y,
+                        game.camera_offset.x, game.camera_offset.y,
+                        hitbox.x, hitbox.y, hitbox.width, hitbox.height, player.direction.x, player.direction.y),
+        pack_rng(store.rng),
+        COUNT.pack(len(dungeon)), dungeon,
+        bytes(room.visited for room in game.dungeon.rooms),
+        COUNT.pack(store.count),
+        np.array([sprite.hitbox_rect.topleft for sprite in store.sprites], dtype=np.int32).tobytes(),
+    ]
+    parts += [getattr(store, name)[:store.count].tobytes() for name in ENEMY_FIELDS]
+    parts.append(COUNT.pack(tears.count))
+    parts += [getattr(tears, name)[:tears.count].tobytes() for name in TEAR_FIELDS]
+    return b''.join(parts)
+
+
+def restore_snapshot(game, data):
+    # Put a Game back into a snapshotted state. Images, room templates and (for the same floor) Room
+    # objects are reused; enemy sprites are only rebuilt when the set of enemy kinds differs.
+    magic, version = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Not a version {SNAPSHOT_VERSION} game snapshot")
+    offset = HEADER.size
+    (seed, episode, ticks, frame, can_shoot, shoot_time, transitioning, transition_timer, running,
+     room_x, room_y, camera_x, camera_y, hitbox_x, hitbox_y, hitbox_width, hitbox_height,
+     direction_x, direction_y) = GAME_STATE.unpack_from(data, offset)
+    offset += GAME_STATE.size
+    rng_state = data[offset:offset + RNG_STATE.size]
+    offset += RNG_STATE.size
+    (dungeon_size,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    dungeon = data[offset:offset + dungeon_size]
+    offset += dungeon_size
+    (room_count,) = struct.unpack_from('<I', dungeon, 4)
+    visited = data[offset:offset + room_count]
+    offset += room_count
+
+    game.seed, game.episode = seed, episode
+    game.sim_clock.ticks, game.sim_clock.frame = ticks, frame
+    game.can_shoot, game.shoot_time = can_shoot, shoot_time
+    game.transitioning, game.transition_timer, game.running = transitioning, transition_timer, running
+
+    if dungeon != pack_dungeon(game.dungeon):
+        game.dungeon = unpack_dungeon(dungeon)
+        game.grid, game.rooms = game.dungeon.grid, game.dungeon.rooms
+        game.current_room = None
+    for room, flag in zip(game.dungeon.rooms, visited):
+        room.visited = bool(flag)
+    room = game.dungeon.room_at(room_x, room_y)
+    if room is not game.current_room:
+        for sprite in game.room_sprites: sprite.kill()
+        game.current_room = room
+        if not room.loaded:
+            create_room_surface(room, game.floor_image, game.door_image)
+        game.collision_sprites.empty()
+        game.collision_sprites.add(room.collision_sprites)
+        game.populate_room(spawn_enemies=False)  # rocks and coins; the enemies come from the snapshot
+        game.room_streamer.enter(room)
+    game.camera_offset.update(camera_x, camera_y)
+
+    player = game.player
+    player.hitbox_rect.update(hitbox_x, hitbox_y, hitbox_width, hitbox_height)
+    player.rect.center = player.hitbox_rect.center
+    player.direction.update(direction_x, direction_y)
+
+    store = game.enemy_sprites.store
+    unpack_rng(store.rng, rng_state)
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    topleft = np.frombuffer(data, dtype=np.int32, count=count * 2, offset=offset).reshape(count, 2)
+    offset += topleft.nbytes
+    field_offsets = {}
+    for name in ENEMY_FIELDS:
+        field_offsets[name] = offset
+        offset += count * getattr(store, name).strides[0]
+
+    kinds = np.frombuffer(data, dtype=store.kind.dtype, count=count, offset=field_offsets['kind'])
+    if store.count != count or not np.array_equal(store.kind[:count], kinds):
+        for enemy in list(game.enemy_sprites): enemy.kill()
+        for kind in kinds.tolist():
+            ENEMY_CLASSES[kind]((0, 0), (game.all_sprites, game.enemy_sprites), game.collision_sprites, player, game.enemy_sprites)
+    view = memoryview(data)
+    for name in ENEMY_FIELDS:
+        copy_rows(getattr(store, name), count, view, field_offsets[name])
+    for sprite, (x, y) in zip(store.sprites, topleft.tolist()):
+        sprite.hitbox_rect.topleft = (x, y)
+        sprite.rect.center = sprite.hitbox_rect.center
+        game.enemy_sprites.relocate(sprite)
+
+    tears = game.tears
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    if count > tears.capacity:
+        tears.allocate(max(count, tears.capacity * 2))
+    for name in TEAR_FIELDS:
+        offset = copy_rows(getattr(tears, name), count, view, offset)
+    tears.count = count
+
+
+def copy_rows(array, count, view, offset):
+    # Raw copy of count rows from the snapshot into the front of a C-contiguous array; returns the next offset
+    size = count * array.strides[0]
+    memoryview(array).cast('B')[:size] = view[offset:offset + size]
+    return offset + size
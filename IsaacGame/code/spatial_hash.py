@@ -0,0 +1,58 @@
+# spatial_hash.py
+from settings import TILE_SIZE
+
+
+class SpatialHash:
+    # Uniform grid broadphase: every object is bucketed into the TILE_SIZE cells its rect overlaps.
+    # Buckets are dicts so candidates come back in insertion order (deterministic collision resolution).
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.object_cells = {}
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, obj, rect):
+        cell_range = self.cell_range(rect)
+        self.object_cells[obj] = cell_range
+        left, top, right, bottom = cell_range
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                self.cells.setdefault((cx, cy), {})[obj] = None
+
+    def remove(self, obj):
+        cell_range = self.object_cells.pop(obj, None)
+        if cell_range is None: return
+        left, top, right, bottom = cell_range
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is None: continue
+                bucket.pop(obj, None)
+                if not bucket: del self.cells[(cx, cy)]
+
+    def update(self, obj, rect):
+        # Incremental move: only touches the buckets when the covered cells actually changed
+        if self.object_cells.get(obj) == self.cell_range(rect): return
+        self.remove(obj)
+        self.insert(obj, rect)
+
+    def query(self, rect):
+        left, top, right, bottom = self.cell_range(rect)
+        if left == right and top == bottom:
+            return list(self.cells.get((left, top), ()))
+        found = {}
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket: found.update(bucket)
+        return list(found)
+
+    def clear(self):
+        self.cells.clear()
+        self.object_cells.clear()
+
+    def __len__(self):
+        return len(self.object_cells)
@@ -0,0 +1,100 @@
+# tilemap.py
+import numpy as np
+import pygame_env
+import pygame
+from settings import TILE_SIZE
+
+
+def merge_rects(rects):
+    # Fewer, larger rects covering the same area: runs of rects that share a full edge are joined,
+    # first along rows, then the resulting strips along columns
+    merged = []
+    for rect in sorted((pygame.Rect(rect) for rect in rects), key=lambda r: (r.top, r.height, r.left)):
+        last = merged[-1] if merged else None
+        if last and last.top == rect.top and last.height == rect.height and rect.left <= last.right:
+            last.width = max(last.right, rect.right) - last.left
+        else:
+            merged.append(rect)
+    columns = []
+    for rect in sorted(merged, key=lambda r: (r.left, r.width, r.top)):
+        last = columns[-1] if columns else None
+        if last and last.left == rect.left and last.width == rect.width and rect.top <= last.bottom:
+            last.height = max(last.bottom, rect.bottom) - last.top
+        else:
+            columns.append(rect)
+    return columns
+
+
+class StaticCollisionMap:
+    # Static geometry of one room (walls, rocks) as merged rects plus a tile bitmap over them.
+    # Every tile lists the rects that touch it, so a query only looks at the tiles a rect spans
+    # and the exact test runs against just those few rects.
+    def __init__(self, rects, tile_size=TILE_SIZE):
+        self.tile_size = tile_size
+        self.rects = merge_rects(rects)
+        if self.rects:
+            bounds = self.rects[0].unionall(self.rects)
+            self.origin_x = bounds.left // tile_size * tile_size
+            self.origin_y = bounds.top // tile_size * tile_size
+            width = -(-(bounds.right - self.origin_x) // tile_size)
+            height = -(-(bounds.bottom - self.origin_y) // tile_size)
+        else:
+            self.origin_x = self.origin_y = width = height = 0
+        self.width, self.height = width, height
+        self.edges = np.array([(r.left, r.top, r.right, r.bottom) for r in self.rects], dtype=np.int64).reshape(-1, 4)
+        self.tile_origin = np.array((self.origin_x, self.origin_y), dtype=np.int64)
+        self.tile_limit = np.array((width - 1, height - 1), dtype=np.int64)
+        self.bitmap = np.zeros((height, width), dtype=np.bool_)
+        self.cells = [[[] for _ in range(width)] for _ in range(height)]  # [ty][tx] -> indices into rects
+        for index, rect in enumerate(self.rects):
+            x0, y0, x1, y1 = self.tile_span(rect)
+            self.bitmap[y0:y1 + 1, x0:x1 + 1] = True
+            for ty in range(y0, y1 + 1):
+                for tx in range(x0, x1 + 1):
+                    self.cells[ty][tx].append(index)
+        # reach[ty, tx]: static geometry in this tile or the ones right, below or diagonally below-right,
+        # i.e. anywhere a rect up to a tile in size with its top-left corner in this tile can reach
+        self.reach = self.bitmap.copy()
+        self.reach[:, :-1] |= self.bitmap[:, 1:]
+        self.reach[:-1, :] |= self.reach[1:, :].copy()
+
+    def tile_span(self, rect):
+        # Inclusive tile range a rect touches, clamped to the map
+        size = self.tile_size
+        x0 = min(max((rect.left - self.origin_x) // size, 0), self.width - 1)
+        x1 = min(max((rect.right - 1 - self.origin_x) // size, 0), self.width - 1)
+        y0 = min(max((rect.top - self.origin_y) // size, 0), self.height - 1)
+        y1 = min(max((rect.bottom - 1 - self.origin_y) // size, 0), self.height - 1)
+        return x0, y0, x1, y1
+
+    def query(self, rect):
+        # Static rects overlapping rect, in a fixed order. Runs once per moving entity per tick, hence inlined.
+        size = self.tile_size
+        x0 = (rect.left - self.origin_x) // size
+        x1 = (rect.right - 1 - self.origin_x) // size
+        y0 = (rect.top - self.origin_y) // size
+        y1 = (rect.bottom - 1 - self.origin_y) // size
+        if x1 < 0 or y1 < 0 or x0 >= self.width or y0 >= self.height: return []  # nothing static out there
+        if x0 < 0: x0 = 0
+        if y0 < 0: y0 = 0
+        rects = self.rects
+        if x0 == x1 and y0 == y1:
+            return [rects[index] for index in self.cells[y0][x0] if rects[index].colliderect(rect)]
+        indices = {index for row in self.cells[y0:y1 + 1] for cell in row[x0:x1 + 1] for index in cell}
+        return [rects[index] for index in sorted(indices) if rects[index].colliderect(rect)]
+
+    def overlapping(self, rects):
+        # rects: int array of (left, top, width, height), each at most a tile in size (tears)
+        # -> bool per rect touching static geometry. One lookup of the top-left tile in the reach bitmap
+        # rules out everything away from walls; only the rects left over get the exact test.
+        hit = np.zeros(len(rects), dtype=np.bool_)
+        if not self.rects or not len(rects): return hit
+        tiles = np.clip((rects[:, :2] - self.tile_origin) // self.tile_size, 0, self.tile_limit)
+        near = np.flatnonzero(self.reach[tiles[:, 1], tiles[:, 0]])
+        if len(near):
+            rect = rects[near]
+            left, top = rect[:, 0:1], rect[:, 1:2]
+            edges = self.edges
+            hit[near] = ((left < edges[:, 2]) & (edges[:, 0] < left + rect[:, 2:3])
+                         & (top < edges[:, 3]) & (edges[:, 1] < top + rect[:, 3:4])).any(axis=1)
+        return hit
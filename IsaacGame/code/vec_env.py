@@ -0,0 +1,210 @@
+# vec_env.py
+import os
+import random
+import traceback
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from settings import WIDTH, HEIGHT
+from observation import SymbolicEncoder, OBS_SHAPE as SYMBOLIC_OBS_SHAPE
+from pixel_observer import PixelObserver, frame_buffer_shape
+
+# Observation vector: player x/y, can_shoot, room grid x/y, enemy count, then (dx, dy, hp ratio) per enemy slot
+OBS_MAX_ENEMIES = 8
+OBS_SIZE = 6 + 3 * OBS_MAX_ENEMIES
+ACTION_SIZE = 4  # move x, move y, shoot x, shoot y
+
+# obs_mode -> (dtype, shape) of one observation; 'symbolic' is the uint8 tile grid from observation.py,
+# 'pixels' the low-res RGBX frame ring from pixel_observer.py (newest frame index in the 'latest' array)
+OBS_MODES = {
+    'vector': (np.float32, (OBS_SIZE,)),
+    'symbolic': (np.uint8, SYMBOLIC_OBS_SHAPE),
+    'pixels': (np.uint8, frame_buffer_shape()),
+}
+
+
+def buffer_layout(num_envs, obs_mode='vector'):
+    # (name, dtype, shape) of every array living in the shared block, in order
+    obs_dtype, obs_shape = OBS_MODES[obs_mode]
+    layout = [
+        ('obs', obs_dtype, (num_envs,) + obs_shape),
+        ('actions', np.float32, (num_envs, ACTION_SIZE)),
+        ('rewards', np.float32, (num_envs,)),
+        ('dones', np.uint8, (num_envs,)),
+    ]
+    if obs_mode == 'pixels':
+        layout.append(('latest', np.int32, (num_envs,)))
+    return layout
+
+
+def buffer_size(num_envs, obs_mode='vector'):
+    return sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in buffer_layout(num_envs, obs_mode))
+
+
+def buffer_views(buf, num_envs, obs_mode='vector'):
+    views = {}
+    offset = 0
+    for name, dtype, shape in buffer_layout(num_envs, obs_mode):
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += views[name].nbytes
+    return views
+
+
+def write_observation(game, out):
+    # Fills one row of the shared obs array in place
+    out[:] = 0
+    room = game.current_room
+    player_x = game.player.rect.centerx - room.world_x
+    player_y = game.player.rect.centery - room.world_y
+    out[0] = player_x / WIDTH
+    out[1] = player_y / HEIGHT
+    out[2] = game.can_shoot
+    out[3] = room.grid_x / game.grid_width
+    out[4] = room.grid_y / game.grid_height
+    out[5] = min(len(game.enemy_sprites), OBS_MAX_ENEMIES) / OBS_MAX_ENEMIES
+    slot = 6
+    for enemy in game.enemy_sprites:
+        if slot >= OBS_SIZE: break
+        out[slot] = (enemy.rect.centerx - room.world_x - player_x) / WIDTH
+        out[slot + 1] = (enemy.rect.centery - room.world_y - player_y) / HEIGHT
+        out[slot + 2] = max(0, enemy.hit_points) / enemy.max_hit_points
+        slot += 3
+
+
+def enemy_health(game):
+    return sum(max(0, enemy.hit_points) for enemy in game.enemy_sprites)
+
+
+def _worker(conn, shm_name, num_envs, env_ids, max_episode_steps, seed, obs_mode):
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    from main import Game
+    from simulation import Action
+
+    random.seed(seed)  # forked workers would otherwise share the parent's random state and build the same dungeons
+    shm = SharedMemory(name=shm_name)
+    views = buffer_views(shm.buf, num_envs, obs_mode)
+    observers = []
+    try:
+        games = [Game(WIDTH, HEIGHT, headless=True) for _ in env_ids]
+        if obs_mode == 'symbolic':
+            observers = [SymbolicEncoder(game) for game in games]
+            observe = lambda i, env_id, new_episode: observers[i].encode(views['obs'][env_id])
+        elif obs_mode == 'pixels':
+            # Each observer renders straight into its env's slice of the shared block
+            observers = [PixelObserver(game, buffer=views['obs'][env_id]) for game, env_id in zip(games, env_ids)]
+
+            def observe(i, env_id, new_episode):
+                observers[i].reset() if new_episode else observers[i].observe()
+                views['latest'][env_id] = observers[i].latest
+        else:
+            observe = lambda i, env_id, new_episode: write_observation(games[i], views['obs'][env_id])
+        steps = [0] * len(env_ids)
+        while True:
+            cmd = conn.recv_bytes()
+            if cmd == b'close':
+                break
+            try:
+                for i, env_id in enumerate(env_ids):
+                    game = games[i]
+                    new_episode = cmd == b'reset'
+                    if cmd == b'reset':
+                        game.reset()
+                        steps[i] = 0
+                        views['rewards'][env_id] = 0
+                        views['dones'][env_id] = 0
+                    elif cmd == b'step':
+                        move_x, move_y, shoot_x, shoot_y = views['actions'][env_id]
+                        room = game.current_room
+                        health = enemy_health(game)
+                        running = game.step(Action((move_x, move_y), (shoot_x, shoot_y)))
+                        steps[i] += 1
+                        # Leaving a room clears its enemies, which is not damage dealt
+                        views['rewards'][env_id] = health - enemy_health(game) if game.current_room is room else 0
+                        done = not running or steps[i] >= max_episode_steps
+                        views['dones'][env_id] = done
+                        if done:
+                            game.reset()
+                            steps[i] = 0
+                            new_episode = True
+                    observe(i, env_id, new_episode)
+                conn.send_bytes(b'ok')
+            except Exception:
+                conn.send_bytes(b'error:' + traceback.format_exc().encode())
+    finally:
+        observers.clear()  # pixel surfaces point into the shared block, drop them before closing it
+        views.clear()
+        shm.close()
+
+
+class VecEnv:
+    # N independent headless games spread over a process pool. Workers write observations, rewards and
+    # done flags straight into one shared-memory block; per step only a command byte crosses the pipes.
+    # obs_mode picks the observation: 'vector' (player/enemy features), 'symbolic' (uint8 tile grid)
+    # or 'pixels' (stack of low-res frames).
+    def __init__(self, num_envs, num_workers=None, max_episode_steps=2000, seed=None, start_method=None, obs_mode='vector'):
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"Unknown obs_mode {obs_mode!r}, expected one of {sorted(OBS_MODES)}")
+        self.num_envs = num_envs
+        self.obs_mode = obs_mode
+        self.num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        self.shm = SharedMemory(create=True, size=buffer_size(num_envs, obs_mode))
+        views = buffer_views(self.shm.buf, num_envs, obs_mode)
+        self.obs = views['obs']
+        self.actions = views['actions']
+        self.rewards = views['rewards']
+        self.dones = views['dones']
+        self.latest = views.get('latest')  # pixels mode: index of the newest frame in each env's ring
+
+        ctx = mp.get_context(start_method)
+        self.conns = []
+        self.processes = []
+        for rank in range(self.num_workers):
+            env_ids = list(range(rank, num_envs, self.num_workers))
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child_conn, self.shm.name, num_envs, env_ids,
+                                                        max_episode_steps, seed + rank, obs_mode), daemon=True)
+            process.start()
+            child_conn.close()
+            self.conns.append(parent_conn)
+            self.processes.append(process)
+        self.closed = False
+
+    def _broadcast(self, cmd):
+        for conn in self.conns:
+            conn.send_bytes(cmd)
+        for conn in self.conns:
+            reply = conn.recv_bytes()
+            if reply != b'ok':
+                raise RuntimeError(f"VecEnv worker failed:\n{reply[len(b'error:'):].decode()}")
+
+    def reset(self):
+        self._broadcast(b'reset')
+        return self.obs
+
+    def step(self, actions):
+        # Returns views into shared memory; copy them if they must outlive the next step
+        self.actions[:] = actions
+        self._broadcast(b'step')
+        return self.obs, self.rewards, self.dones
+
+    def close(self):
+        if self.closed: return
+        self.closed = True
+        for conn in self.conns:
+            try: conn.send_bytes(b'close')
+            except (BrokenPipeError, OSError): pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive(): process.terminate()
+        self.obs = self.actions = self.rewards = self.dones = self.latest = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()